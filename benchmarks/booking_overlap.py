@@ -0,0 +1,98 @@
+"""
+Бенчмарк пересчета остатков номеров по бронированиям за период.
+
+RoomInventoryRepository.rebuild(date_from, date_to) выбирает брони, пересекающиеся
+с периодом, по bookings.period && daterange(...). Сравнивается время пересчета
+с GiST-индексом ix_bookings_room_id_period и без него на N синтетических бронях.
+Индекс удаляется внутри транзакции замера и возвращается ее откатом.
+
+Запуск (нужна тестовая БД из .env-test, MODE=TEST: таблицы пересоздаются):
+    python -m benchmarks.booking_overlap
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from src.config import settings
+from src.database import Base, async_session_maker_null_pool, engine_null_pool
+from src.models import *  # noqa
+from src.schemas.bookings import BookingAdd
+from src.schemas.hotels import HotelAdd
+from src.schemas.rooms import RoomAdd
+from src.schemas.users import UserAdd
+from src.utils.db_manager import DBManager
+
+BOOKINGS = 200_000
+HOTELS = 100
+ROOMS_PER_HOTEL = 10
+REPEATS = 5
+START = date(2030, 1, 1)
+DATE_FROM = date(2030, 7, 1)
+DATE_TO = date(2030, 7, 8)
+
+
+def synthetic_bookings(user_id: int, rooms_ids: list[int]):
+    for _ in range(BOOKINGS):
+        date_from = START + timedelta(days=random.randrange(365))
+        yield BookingAdd(
+            user_id=user_id,
+            room_id=random.choice(rooms_ids),
+            date_from=date_from,
+            date_to=date_from + timedelta(days=random.randint(1, 14)),
+            price=1000,
+        )
+
+
+async def seed() -> None:
+    async with engine_null_pool.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        user = await db.users.add(UserAdd(email="benchmark@example.com", hashed_password="-"))
+        await db.hotels.add_bulk(
+            HotelAdd(title=f"Отель {i}", location=f"Город {i}") for i in range(HOTELS)
+        )
+        hotels_ids = [hotel.id for hotel in await db.hotels.get_all()]
+        # Номеров хватает на все брони: пересчет не упирается в овербукинг
+        await db.rooms.add_bulk(
+            RoomAdd(hotel_id=hotel_id, title="Номер", description=None, price=1000, quantity=BOOKINGS)
+            for hotel_id in hotels_ids
+            for _ in range(ROOMS_PER_HOTEL)
+        )
+        rooms_ids = [room.id for room in await db.rooms.get_all()]
+        await db.bookings.add_bulk(synthetic_bookings(user.id, rooms_ids))
+        await db.commit()
+
+    async with engine_null_pool.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+
+async def measure(with_index: bool) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        # Изменения откатываются при выходе из DBManager вместе с удалением индекса
+        async with DBManager(session_factory=async_session_maker_null_pool) as db:
+            if not with_index:
+                await db.session.execute(text("DROP INDEX ix_bookings_room_id_period"))
+            started_at = time.perf_counter()
+            await db.room_inventory.rebuild(DATE_FROM, DATE_TO)
+            best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+async def main():
+    assert settings.MODE == "TEST"
+    await seed()
+    baseline = await measure(with_index=False)
+    print(f"без индекса по period: {baseline * 1000:8.1f} мс")
+    elapsed = await measure(with_index=True)
+    print(f"с GiST-индексом:       {elapsed * 1000:8.1f} мс (x{baseline / elapsed:.1f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
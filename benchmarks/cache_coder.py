@@ -0,0 +1,79 @@
+"""
+Микробенчмарк попадания в кэш ответов для прежнего JsonCoder и OrjsonCoder.
+
+Для JsonCoder попадание - это декодирование JSON из Redis и повторная сериализация ответа
+FastAPI (jsonable_encoder + JSONResponse). OrjsonCoder отдает сохраненное тело как есть.
+Размер записи - это размер значения, которое хранится в Redis под ключом.
+
+Запуск (нужны переменные окружения приложения, например из .env-test):
+    python -m benchmarks.cache_coder
+"""
+
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache.coder import JsonCoder
+from starlette.responses import JSONResponse
+
+from src.schemas.facilities import Facility
+from src.schemas.hotels import Hotel
+from src.schemas.rooms import RoomWithRels
+from src.utils.cache import OrjsonCoder
+
+REPEATS = 200
+
+PAYLOADS = {
+    "GET /hotels (1000 отелей)": [
+        Hotel(id=i, title=f"Отель {i}", location=f"Город {i % 100}") for i in range(1000)
+    ],
+    "GET /rooms (200 номеров)": [
+        RoomWithRels(
+            id=i,
+            hotel_id=1,
+            title=f"Номер {i}",
+            description="Просторный номер с видом на море",
+            price=1000 + i,
+            quantity=5,
+            facilities=[Facility(id=j, title=f"Удобство {j}") for j in range(5)],
+        )
+        for i in range(200)
+    ],
+}
+
+
+def json_coder_hit(cached: bytes) -> bytes:
+    return JSONResponse(jsonable_encoder(JsonCoder.decode_as_type(cached, type_=None))).body
+
+
+def orjson_coder_hit(cached: bytes) -> bytes:
+    return OrjsonCoder.decode_as_type(cached, type_=None).body
+
+
+def measure(func, cached: bytes) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        started_at = time.perf_counter()
+        func(cached)
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def main():
+    for name, payload in PAYLOADS.items():
+        json_cached = JsonCoder.encode(payload)
+        orjson_cached = OrjsonCoder.encode(payload)
+        assert json.loads(json_coder_hit(json_cached)) == json.loads(orjson_coder_hit(orjson_cached))
+
+        baseline = measure(json_coder_hit, json_cached)
+        elapsed = measure(orjson_coder_hit, orjson_cached)
+        print(name)
+        print(f"  JsonCoder:   {baseline * 1000:8.3f} мс, {len(json_cached):8d} байт")
+        print(
+            f"  OrjsonCoder: {elapsed * 1000:8.3f} мс, {len(orjson_cached):8d} байт "
+            f"(x{baseline / elapsed:.0f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Микробенчмарк маппинга результатов выборки в pydantic-схемы.
+
+Сравнивает прежний путь BaseRepository.get_filtred (ORM-объекты с identity map
+и model_validate на каждую строку) с выборкой колонок и TypeAdapter(list[Schema]).
+Используется SQLite в памяти, чтобы измерять только работу на стороне Python.
+
+Запуск (нужны переменные окружения приложения, например из .env-test):
+    python -m benchmarks.mapping
+"""
+
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from src.models.hotels import HotelsOrm
+from src.repositories.mappers.mappers import HotelDataMapper
+from src.schemas.hotels import Hotel
+
+ROWS = 20_000
+REPEATS = 5
+
+
+def orm_path(session: Session) -> list[Hotel]:
+    result = session.execute(select(HotelsOrm))
+    return [HotelDataMapper.map_to_domain_entity(model) for model in result.scalars().all()]
+
+
+def columns_path(session: Session) -> list[Hotel]:
+    result = session.execute(
+        select(HotelsOrm.title, HotelsOrm.location, HotelsOrm.id)
+    )
+    return HotelDataMapper.map_rows_to_domain_entities(tuple(result.keys()), result.all())
+
+
+def columns_construct_path(session: Session) -> list[Hotel]:
+    result = session.execute(
+        select(HotelsOrm.title, HotelsOrm.location, HotelsOrm.id)
+    )
+    keys = tuple(result.keys())
+    return [Hotel.model_construct(**dict(zip(keys, row))) for row in result.all()]
+
+
+def measure(func, engine) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        with Session(engine) as session:
+            started_at = time.perf_counter()
+            hotels = func(session)
+            best = min(best, time.perf_counter() - started_at)
+        assert len(hotels) == ROWS
+    return best
+
+
+def main():
+    engine = create_engine("sqlite://")
+    HotelsOrm.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(HotelsOrm),
+            [{"title": f"Отель {i}", "location": f"Город {i % 100}"} for i in range(ROWS)],
+        )
+
+    baseline = measure(orm_path, engine)
+    print(f"ORM + model_validate:        {baseline * 1000:8.1f} мс")
+    for name, func in [
+        ("колонки + TypeAdapter:      ", columns_path),
+        ("колонки + model_construct:  ", columns_construct_path),
+    ]:
+        elapsed = measure(func, engine)
+        print(f"{name}{elapsed * 1000:8.1f} мс (x{baseline / elapsed:.1f})")
+
+
+if __name__ == "__main__":
+    main()
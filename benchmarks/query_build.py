@@ -0,0 +1,82 @@
+"""
+Микробенчмарк построения запроса поиска отелей по датам.
+
+Сравнивает прежний путь HotelsRepository.get_filtered_by_time (дерево выражений
+собирается заново на каждый запрос, и SQLAlchemy каждый раз пересчитывает по нему
+ключ кэша компиляции) с запросом, собранным один раз, где даты и фильтры передаются
+параметрами. Измеряется только работа на стороне Python до отправки запроса в БД.
+
+Запуск (нужны переменные окружения приложения, например из .env-test):
+    python -m benchmarks.query_build
+"""
+
+import time
+from datetime import date
+
+from sqlalchemy import select, func
+
+from src.models.hotels import HotelsOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.hotels import hotels_search_query
+from src.repositories.utils import escape_like, room_is_sold_out
+
+CALLS = 20_000
+REPEATS = 5
+DATE_FROM = date(2026, 7, 1)
+DATE_TO = date(2026, 7, 5)
+
+
+def rebuild_path(location: str) -> None:
+    rooms_ids_to_get = (
+        select(RoomsOrm.id)
+        .select_from(RoomsOrm)
+        .filter(RoomsOrm.quantity > 0, ~room_is_sold_out(RoomsOrm.id, DATE_FROM, DATE_TO))
+    )
+    hotels_ids_to_get = (
+        select(RoomsOrm.hotel_id)
+        .select_from(RoomsOrm)
+        .filter(RoomsOrm.id.in_(rooms_ids_to_get))
+    )
+    query = (
+        select(HotelsOrm)
+        .filter(HotelsOrm.id.in_(hotels_ids_to_get))
+        .filter(func.lower(HotelsOrm.location).like(f"%{escape_like(location)}%", escape="/"))
+        .limit(5)
+        .offset(0)
+    )
+    query._generate_cache_key()
+
+
+def reuse_path(location: str):
+    params = {
+        "date_from": DATE_FROM,
+        "date_to": DATE_TO,
+        "limit": 5,
+        "offset": 0,
+        "after_id": None,
+        "location": f"%{escape_like(location)}%",
+    }
+    query = hotels_search_query(True, False, False, False)
+    query._generate_cache_key()
+    return query, params
+
+
+def measure(func) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        started_at = time.perf_counter()
+        for i in range(CALLS):
+            func(f"город {i % 100}")
+        best = min(best, time.perf_counter() - started_at)
+    return best / CALLS
+
+
+def main():
+    baseline = measure(rebuild_path)
+    print(f"сборка на каждый запрос:   {baseline * 1e6:8.1f} мкс")
+    elapsed = measure(reuse_path)
+    print(f"готовый запрос + параметры:{elapsed * 1e6:8.1f} мкс (x{baseline / elapsed:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ from src.exceptions import ObjectAlreadyExistsException, EmailNotRegisteredExcep
     UserEmailAlreadyExistsHTTPException
 from src.schemas.users import UserRequestAdd, UserAdd
 from src.services.auth import AuthService
-from src.api.dependencies import UserIdDep, DBDep
+from src.api.dependencies import UserIdDep, DBDep, ReadDBDep
 
 router = APIRouter(prefix="/auth", tags=["Авторизация и аутентификация"])
 
@@ -33,7 +33,7 @@ async def login_user(db: DBDep, data: UserRequestAdd, response: Response):
 
 @router.get("/me")
 async def get_me(
-    db: DBDep,
+    db: ReadDBDep,
     user_id: UserIdDep,
 ):
     return await AuthService(db).get_one_or_none_user(user_id)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Body
+
+from src.api.dependencies import ReadDBDep
+from src.schemas.availability import AvailabilityRequest
+from src.services.rooms import RoomService
+
+router = APIRouter(prefix="/availability", tags=["Доступность"])
+
+
+@router.post(
+    "/batch",
+    summary="Проверить доступность номеров для нескольких отелей и дат",
+    description="Все проверки выполняются одним запросом к БД, не более 50 проверок за раз",
+)
+async def get_availability_batch(
+    db: ReadDBDep,
+    requests: list[AvailabilityRequest] = Body(
+        max_length=50,
+        openapi_examples={
+            "1": {
+                "summary": "Два отеля",
+                "value": [
+                    {"hotel_id": 1, "date_from": "2024-08-01", "date_to": "2024-08-10"},
+                    {"hotel_id": 2, "date_from": "2024-08-05", "date_to": "2024-08-07"},
+                ],
+            }
+        },
+    ),
+):
+    return await RoomService(db).get_available_batch(requests)
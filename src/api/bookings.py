@@ -1,33 +1,60 @@
-from fastapi import APIRouter, HTTPException
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
+from src.config import settings
 from src.exceptions import AllRoomsAreBookedException, AllRoomsAreBookedHTTPException
 from src.schemas.bookings import BookingAddRequest
-from src.api.dependencies import UserIdDep, DBDep
+from src.api.dependencies import UserIdDep, DBDep, DBManagerDep, ReadDBDep, stick_to_primary
 from src.services.bookings import BookingService
+from src.tasks.tasks import enqueue_precompute_hotel_searches
+from src.utils.cache import cache
 
 router = APIRouter(prefix="/bookings", tags=["Бронирования"])
 
 
 @router.post("", summary="Создать бронирование")
 async def create_booking(
-    db: DBDep, user_id: UserIdDep, booking_data: BookingAddRequest
+    db: DBDep,
+    user_id: UserIdDep,
+    booking_data: BookingAddRequest,
+    response: Response,
+    background_tasks: BackgroundTasks,
 ):
     try:
         booking = await BookingService(db).add_booking(user_id, booking_data)
     except AllRoomsAreBookedException:
         raise AllRoomsAreBookedHTTPException
+    stick_to_primary(response)
+    if settings.PRECOMPUTE_ENABLED:
+        # Пересчитываем только популярные поиски, пересекающиеся с датами брони, после ответа
+        background_tasks.add_task(
+            enqueue_precompute_hotel_searches, booking.date_from, booking.date_to
+        )
 
     return {"status": "OK", "data": booking}
 
 
 @router.get("", summary="Получить список всех бронирований", description="")
-@cache(expire=10)
-async def get_bookings(db: DBDep):
+@cache(expire=settings.CACHE_EXPIRE, namespace="bookings")
+async def get_bookings(db: ReadDBDep):
     return await BookingService(db).get_bookings()
 
 
+@router.get(
+    "/stream",
+    summary="Получить список всех бронирований потоком",
+    description="Бронирования отдаются в формате NDJSON по мере чтения из БД",
+)
+async def stream_bookings(db_manager: DBManagerDep):
+    async def bookings_ndjson():
+        async with db_manager as db:
+            async for booking in BookingService(db).iter_bookings():
+                yield booking.model_dump_json() + "\n"
+
+    return StreamingResponse(bookings_ndjson(), media_type="application/x-ndjson")
+
+
 @router.get("/me", summary="Получить список моих бронирований", description="")
-@cache(expire=10)
-async def get_my_bookings(db: DBDep, user_id: UserIdDep):
+@cache(expire=settings.CACHE_EXPIRE, namespace="bookings")
+async def get_my_bookings(db: ReadDBDep, user_id: UserIdDep):
     return await BookingService(db).get_my_bookings(user_id)
@@ -1,16 +1,35 @@
+from datetime import date
 from typing import Annotated
-from fastapi import Depends, Query, Request
+from fastapi import BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 
 from src.exceptions import IncorrectTokenException, IncorrectTokenHTTPException, NoAccessTokenHTTPException
 from src.services.auth import AuthService
+from src.utils.bloom import BloomFilter
+from src.utils.cache import (
+    cache_tag_version,
+    etag_matches,
+    get_cache_tag_version,
+    invalidated_within,
+    is_cached_missing,
+)
+from src.utils.search_windows import SearchWindow, record_search_window
 from src.utils.db_manager import DBManager
-from src.database import async_session_maker
+from src.config import settings
+from src.database import async_session_maker, async_session_maker_read_only, replica_engines
 
 
 class PaginationParams(BaseModel):
     page: Annotated[int | None, Query(default=1, gt=0)]
     per_page: Annotated[int | None, Query(default=None, gt=0, lt=30)]
+    cursor: Annotated[
+        str | None,
+        Query(
+            default=None,
+            description="Курсор для постраничного вывода по id: пустое значение - первая страница, "
+            "дальше - next_cursor из предыдущего ответа. При передаче курсора page игнорируется",
+        ),
+    ]
 
 
 PaginationDep = Annotated[PaginationParams, Depends()]
@@ -34,13 +53,117 @@ def get_current_user_id(token: str = Depends(get_token)) -> int:
 UserIdDep = Annotated[int, Depends(get_current_user_id)]
 
 
+def _int_path_params(request: Request) -> dict[str, int] | None:
+    # Некорректные id проверит сам эндпоинт и ответит 422
+    try:
+        return {name: int(value) for name, value in request.path_params.items()}
+    except ValueError:
+        return None
+
+
+def conditional_get(tag: str):
+    """
+    ETag для GET-эндпоинта по версии тега кэша, например "rooms:{hotel_id}".
+    Если ETag совпал с If-None-Match, отвечает 304 еще до открытия сессии БД.
+    """
+
+    async def check_etag(request: Request):
+        path_params = _int_path_params(request)
+        if path_params is None:
+            return
+        version = await get_cache_tag_version(tag.format(**path_params))
+        if version is None:
+            return
+        etag = f'W/"{version}"'
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        cache_tag_version.set(version)
+        # Итоговый заголовок ставит middleware: декоратор кэша перезаписывает ETag своим
+        request.state.etag = etag
+
+    return Depends(check_etag)
+
+
+def reject_missing(bloom: BloomFilter, tag: str, id_param: str, exception: type[HTTPException]):
+    """
+    Отвечает 404 без запроса к БД, если id из пути точно нет в bloom-фильтре
+    или он недавно уже не был найден (отрицательный кэш по тегу tag).
+    Пока фильтр не заполнен, его пропускают все id и их проверяет по БД сам эндпоинт
+    """
+
+    async def check_exists(request: Request):
+        path_params = _int_path_params(request)
+        if path_params is None:
+            return
+        entity_id = path_params[id_param]
+        if not await bloom.might_contain(entity_id):
+            raise exception
+        if await is_cached_missing(tag.format(**path_params), entity_id):
+            raise exception
+
+    return Depends(check_exists)
+
+
+async def track_hotels_search(request: Request, background_tasks: BackgroundTasks):
+    # Учитываем только поиски вида, который предвычисляет задача precompute_hotel_searches:
+    # первая страница по умолчанию, фильтр только по адресу и датам
+    params = request.query_params
+    if not settings.PRECOMPUTE_ENABLED or set(params) - {"location", "date_from", "date_to"}:
+        return
+    try:
+        window = SearchWindow(
+            params.get("location"),
+            date.fromisoformat(params["date_from"]),
+            date.fromisoformat(params["date_to"]),
+        )
+    except (KeyError, ValueError):
+        return
+    background_tasks.add_task(record_search_window, window)
+
+
 def get_db_manager():
     return DBManager(session_factory=async_session_maker)
 
 
+# DBManager без открытой сессии: для потоковых ответов, которые открывают его сами,
+# так как сессия из DBDep закрывается до отправки ответа
+DBManagerDep = Annotated[DBManager, Depends(get_db_manager)]
+
+
 async def get_db():
     async with get_db_manager() as db:
         yield db
 
 
 DBDep = Annotated[DBManager, Depends(get_db)]
+
+
+READ_PRIMARY_COOKIE = "read_primary"
+
+
+def stick_to_primary(response: Response) -> None:
+    # Клиент, который только что записал данные, какое-то время читает с основной БД
+    if replica_engines and settings.DB_REPLICA_STICKINESS:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, "1", max_age=settings.DB_REPLICA_STICKINESS, httponly=True
+        )
+
+
+def can_read_from_replica(request: Request) -> bool:
+    # Сразу после инвалидации кэш заполнился бы с отстающей реплики устаревшими данными
+    return (
+        READ_PRIMARY_COOKIE not in request.cookies
+        and not invalidated_within(settings.DB_REPLICA_MAX_LAG)
+    )
+
+
+async def get_read_db(request: Request):
+    async with DBManager(
+        session_factory=async_session_maker_read_only,
+        read_only=True,
+        use_replica=can_read_from_replica(request),
+    ) as db:
+        yield db
+
+
+ReadDBDep = Annotated[DBManager, Depends(get_read_db)]
@@ -1,18 +1,23 @@
 from fastapi import APIRouter, Body
 
-from fastapi_cache.decorator import cache
-
-from src.api.dependencies import DBDep
+from src.api.dependencies import DBDep, ReadDBDep, conditional_get
+from src.config import settings
 from src.schemas.facilities import FacilityAdd
 from src.services.facilities import FacilityService
+from src.utils.cache import cache
 
 router = APIRouter(prefix="/facilities", tags=["Удобства"])
 
 
-@router.get("", summary="Получить список удобств", description="")
-@cache(expire=10)
+@router.get(
+    "",
+    summary="Получить список удобств",
+    description="",
+    dependencies=[conditional_get("facilities")],
+)
+@cache(expire=settings.CACHE_EXPIRE, namespace="facilities")
 async def get_facilities(
-    db: DBDep,
+    db: ReadDBDep,
 ):
     return await FacilityService(db).get_all()
 
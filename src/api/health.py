@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(prefix="/health", tags=["Состояние"])
+
+
+@router.get("/ready", summary="Готовность принимать трафик: прогрев после старта завершен")
+async def get_readiness(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
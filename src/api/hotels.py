@@ -1,13 +1,16 @@
 from datetime import date
 
-from fastapi import Query, APIRouter, Body
-from fastapi_cache.decorator import cache
+from fastapi import Query, APIRouter, Body, Depends
 
-from src.exceptions import ObjectNotFoundException, HotelNotFoundHTTPException
+from src.config import settings
+from src.exceptions import ObjectNotFoundException, HotelNotFoundHTTPException, IncorrectCursorException, \
+    IncorrectCursorHTTPException
 from src.schemas.hotels import HotelPatch, HotelAdd
 from src.api.dependencies import PaginationDep
-from src.api.dependencies import DBDep
+from src.api.dependencies import DBDep, ReadDBDep, conditional_get, reject_missing, track_hotels_search
+from src.init import hotels_bloom
 from src.services.hotels import HotelService
+from src.utils.cache import cache, cache_missing
 
 router = APIRouter(prefix="/hotels", tags=["Отели"])
 
@@ -16,32 +19,51 @@ router = APIRouter(prefix="/hotels", tags=["Отели"])
     "",
     summary="Получить список отелей",
     description="Можно отправить опционально адрес и/или название отеля для дополнительной фильтрации.<p>Tак же есть"
-    " возможность пагинации, ограничения: page > 0, 1 < per_page < 30 </p>",
+    " возможность пагинации, ограничения: page > 0, 1 < per_page < 30 </p>"
+    "<p>Для стабильной пагинации по курсору передайте пустой cursor, а затем next_cursor из ответа</p>",
+    dependencies=[Depends(track_hotels_search)],
 )
-@cache(expire=10)
+@cache(expire=settings.CACHE_EXPIRE, namespace="hotels")
 async def get_hotels(
     pagination: PaginationDep,
-    db: DBDep,
+    db: ReadDBDep,
     location: str | None = Query(default=None, description="Адрес отеля"),
     title: str | None = Query(default=None, description="Название отеля"),
     date_from: date = Query(example="2024-08-01"),
     date_to: date = Query(example="2024-08-10"),
+    fuzzy: bool = Query(
+        default=False,
+        description="Нечеткий поиск по адресу и названию с учетом опечаток, "
+        "результаты отсортированы по похожести",
+    ),
 ):
-    return await HotelService(db).get_filtered_by_time(
-        pagination,
-        location,
-        title,
-        date_from,
-        date_to,
-    )
-
-
-@router.get("/{hotel_id}", summary="Получить отель по id")
-@cache(expire=10)
-async def get_hotel_by_id(hotel_id: int, db: DBDep):
+    try:
+        return await HotelService(db).get_filtered_by_time(
+            pagination,
+            location,
+            title,
+            date_from,
+            date_to,
+            fuzzy,
+        )
+    except IncorrectCursorException:
+        raise IncorrectCursorHTTPException
+
+
+@router.get(
+    "/{hotel_id}",
+    summary="Получить отель по id",
+    dependencies=[
+        reject_missing(hotels_bloom, "hotel:{hotel_id}", "hotel_id", HotelNotFoundHTTPException),
+        conditional_get("hotel:{hotel_id}"),
+    ],
+)
+@cache(expire=settings.CACHE_EXPIRE, namespace="hotel:{hotel_id}")
+async def get_hotel_by_id(hotel_id: int, db: ReadDBDep):
     try:
         return await HotelService(db).get_hotel(hotel_id)
     except ObjectNotFoundException:
+        await cache_missing(f"hotel:{hotel_id}", hotel_id, settings.NEGATIVE_CACHE_EXPIRE)
         raise HotelNotFoundHTTPException
 
 
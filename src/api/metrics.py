@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from src.database import engine, replica_engines
+from src.init import cache_metrics, redis_manager
+
+router = APIRouter(prefix="/metrics", tags=["Метрики"])
+
+
+@router.get("/cache", summary="Попадания, промахи и время ответа кэша по маршрутам")
+async def get_cache_metrics():
+    return cache_metrics.as_dict()
+
+
+@router.get("/redis-pool", summary="Состояние пула соединений с Redis")
+async def get_redis_pool_metrics():
+    return redis_manager.pool_stats()
+
+
+@router.get("/db-pool", summary="Состояние пулов соединений с БД")
+async def get_db_pool_metrics():
+    return {
+        "primary": engine.pool.stats(),
+        "replicas": [
+            {"host": replica.url.host, **replica.pool.stats()} for replica in replica_engines
+        ],
+    }
@@ -1,19 +1,26 @@
 from fastapi import APIRouter, Body, Query
-from fastapi_cache.decorator import cache
 from datetime import date
 
-from src.api.dependencies import DBDep
+from src.api.dependencies import DBDep, ReadDBDep, conditional_get, reject_missing
+from src.config import settings
 from src.exceptions import HotelNotFoundHTTPException, RoomNotFoundHTTPException, HotelNotFoundException, RoomNotFoundException
 from src.schemas.rooms import RoomPatchRequest, RoomAddRequest
+from src.init import rooms_bloom
 from src.services.rooms import RoomService
+from src.utils.cache import cache, cache_missing
 
 router = APIRouter(prefix="/hotels", tags=["Комнаты"])
 
 
-@router.get("/{hotel_id}/rooms", summary="Получить список комнат", description="")
-@cache(expire=10)
+@router.get(
+    "/{hotel_id}/rooms",
+    summary="Получить список комнат",
+    description="",
+    dependencies=[conditional_get("rooms:{hotel_id}")],
+)
+@cache(expire=settings.CACHE_EXPIRE, namespace="rooms:{hotel_id}")
 async def get_rooms(
-    db: DBDep,
+    db: ReadDBDep,
     hotel_id: int,
     date_from: date = Query(example="2024-08-01"),
     date_to: date = Query(example="2024-08-10"),
@@ -21,12 +28,20 @@ async def get_rooms(
     return await RoomService(db).get_filtered_by_time(hotel_id, date_from, date_to)
 
 
-@router.get("/{hotel_id}/rooms/{room_id}", summary="Получить комнату по id")
-@cache(expire=10)
-async def get_room_by_id(db: DBDep, hotel_id: int, room_id: int):
+@router.get(
+    "/{hotel_id}/rooms/{room_id}",
+    summary="Получить комнату по id",
+    dependencies=[
+        reject_missing(rooms_bloom, "rooms:{hotel_id}", "room_id", RoomNotFoundHTTPException),
+        conditional_get("rooms:{hotel_id}"),
+    ],
+)
+@cache(expire=settings.CACHE_EXPIRE, namespace="rooms:{hotel_id}")
+async def get_room_by_id(db: ReadDBDep, hotel_id: int, room_id: int):
     try:
         return await RoomService(db).get_room(room_id, hotel_id=hotel_id)
     except RoomNotFoundException:
+        await cache_missing(f"rooms:{hotel_id}", room_id, settings.NEGATIVE_CACHE_EXPIRE)
         raise RoomNotFoundHTTPException
 
 
@@ -1,15 +1,57 @@
 import redis.asyncio as redis
 import logging
 
+# Записывает значение, только если текущее равно ожидаемому (пустая строка - ключа нет)
+COMPARE_AND_SET_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if (current or '') ~= ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+else
+    redis.call('SET', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+
 class RedisManager:
-    def __init__(self, host: str, port: int):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_connections: int = 50,
+        pool_timeout: float = 5,
+        socket_timeout: float | None = None,
+        socket_connect_timeout: float | None = None,
+        health_check_interval: int = 0,
+    ):
         self.host = host
         self.port = port
+        self.max_connections = max_connections
+        self.pool_timeout = pool_timeout
+        self.socket_timeout = socket_timeout
+        self.socket_connect_timeout = socket_connect_timeout
+        self.health_check_interval = health_check_interval
+        self.pool = None
         self.redis = None
+        self._compare_and_set = None
 
     async def connect(self):
         logging.info(f"Начинаю подключение к Redis host={self.host}, port={self.port}")
-        self.redis = await redis.Redis(host=self.host, port=self.port)
+        # При исчерпании пула запрос ждет свободное соединение не дольше pool_timeout
+        self.pool = redis.BlockingConnectionPool(
+            host=self.host,
+            port=self.port,
+            max_connections=self.max_connections,
+            timeout=self.pool_timeout,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            health_check_interval=self.health_check_interval,
+        )
+        self.redis = redis.Redis.from_pool(self.pool)
+        self._compare_and_set = self.redis.register_script(COMPARE_AND_SET_SCRIPT)
         logging.info(f"Успешное подключение к Redis host={self.host}, port={self.port}")
 
     async def set(self, key: str, value: str, expire: int = None):
@@ -24,6 +66,44 @@ class RedisManager:
     async def delete(self, key: str):
         await self.redis.delete(key)
 
+    async def mget(self, keys: list[str]) -> list:
+        if not keys:
+            return []
+        return await self.redis.mget(keys)
+
+    async def mset(self, mapping: dict, expire: int = None):
+        if not mapping:
+            return
+        if not expire:
+            await self.redis.mset(mapping)
+            return
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expire)
+            await pipe.execute()
+
+    def pipeline(self, transaction: bool = False):
+        return self.redis.pipeline(transaction=transaction)
+
+    async def compare_and_set(self, key: str, expected: str | None, value: str, expire: int = None) -> bool:
+        return bool(
+            await self._compare_and_set(keys=[key], args=[expected or "", value, expire or 0])
+        )
+
+    def pool_stats(self) -> dict:
+        if self.pool is None:
+            return {"connected": False}
+        in_use = len(self.pool._in_use_connections)
+        return {
+            "connected": True,
+            "max_connections": self.max_connections,
+            "in_use": in_use,
+            "idle": len(self.pool._available_connections),
+            "free": self.max_connections - in_use,
+        }
+
     async def close(self):
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose()
+        self.redis = None
+        self.pool = None
@@ -1,16 +1,58 @@
+import itertools
+
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from src.config import settings
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import NullPool
 
-engine = create_async_engine(settings.DB_URL)
-engine_null_pool = create_async_engine(settings.DB_URL, poolclass=NullPool)
+from src.utils.db_pool import TimedAsyncAdaptedQueuePool
+
+# statement_cache_size - кэш подготовленных запросов самого asyncpg,
+# prepared_statement_cache_size - кэш диалекта SQLAlchemy поверх него
+connect_args = {
+    "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+}
+pool_options = {
+    "poolclass": TimedAsyncAdaptedQueuePool,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+engine = create_async_engine(settings.DB_URL, connect_args=connect_args, **pool_options)
+engine_null_pool = create_async_engine(
+    settings.DB_URL, poolclass=NullPool, connect_args=connect_args
+)
 
 async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
 async_session_maker_null_pool = async_sessionmaker(
     bind=engine_null_pool, expire_on_commit=False
 )
 
+# Для чтения без транзакции: каждый запрос выполняется сам по себе, без BEGIN и ROLLBACK
+async_session_maker_read_only = async_sessionmaker(
+    bind=engine.execution_options(isolation_level="AUTOCOMMIT"), expire_on_commit=False
+)
+async_session_maker_null_pool_read_only = async_sessionmaker(
+    bind=engine_null_pool.execution_options(isolation_level="AUTOCOMMIT"), expire_on_commit=False
+)
+
+# Реплики используются только DBManager для чтения, поэтому сразу в режиме AUTOCOMMIT
+replica_engines = [
+    create_async_engine(
+        url, isolation_level="AUTOCOMMIT", connect_args=connect_args, **pool_options
+    )
+    for url in settings.DB_REPLICA_URLS
+]
+_replica_engines_cycle = itertools.cycle(replica_engines)
+
+
+def get_replica_engine():
+    return next(_replica_engines_cycle) if replica_engines else None
+
 
 class Base(DeclarativeBase):
     pass
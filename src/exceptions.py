@@ -19,6 +19,14 @@ class AllRoomsAreBookedException(MyAppException):
     detail = "Не осталось свободных номеров"
 
 
+class IncorrectCursorException(MyAppException):
+    detail = "Некорректный курсор пагинации"
+
+
+class ReadOnlyDBManagerException(MyAppException):
+    detail = "Изменение данных через DBManager только для чтения"
+
+
 def check_date_to_after_date_from(date_from: date, date_to: date) -> None:
     if date_to <= date_from:
         raise HTTPException(status_code=422, detail="Дата заезда не может быть позже даты выезда")
@@ -68,6 +76,9 @@ class UserAlreadyExistsException(MyAppException):
 class AllRoomsAreBookedHTTPException(MyAppHTTPException):
     status_code = 409
     detail = "Не осталось свободных номеров"
+class IncorrectCursorHTTPException(MyAppHTTPException):
+    status_code = 400
+    detail = "Некорректный курсор пагинации"
 class IncorrectTokenHTTPException(MyAppHTTPException):
     detail = "Некорректный токен"
 class EmailNotRegisteredHTTPException(MyAppHTTPException):
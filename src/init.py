@@ -1,7 +1,36 @@
 from src.connectors.redis_connector import RedisManager
 from src.config import settings
+from src.utils.availability_engine import AvailabilityEngine
+from src.utils.bloom import BloomFilter
+from src.utils.local_cache import LocalCache
+from src.utils.metrics import CacheMetrics
 
 redis_manager = RedisManager(
     host=settings.REDIS_HOST,
     port=settings.REDIS_PORT,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    pool_timeout=settings.REDIS_POOL_TIMEOUT,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+)
+
+availability_engine = AvailabilityEngine(
+    max_hotels=settings.AVAILABILITY_ENGINE_MAX_HOTELS,
+    ttl=settings.AVAILABILITY_ENGINE_TTL,
+)
+
+cache_metrics = CacheMetrics()
+
+local_cache = LocalCache(
+    max_entries=settings.LOCAL_CACHE_MAX_ENTRIES,
+    max_bytes=settings.LOCAL_CACHE_MAX_BYTES,
+    ttl=settings.LOCAL_CACHE_TTL,
+) if settings.LOCAL_CACHE_ENABLED else None
+
+hotels_bloom = BloomFilter(
+    redis_manager, "hotels", size=settings.BLOOM_FILTER_SIZE, hashes=settings.BLOOM_FILTER_HASHES
+)
+rooms_bloom = BloomFilter(
+    redis_manager, "rooms", size=settings.BLOOM_FILTER_SIZE, hashes=settings.BLOOM_FILTER_HASHES
 )
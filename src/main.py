@@ -1,6 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+import asyncio
 import logging
 import sys
+import time
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 from contextlib import asynccontextmanager
@@ -13,21 +15,71 @@ from src.api.auth import router as router_auth
 from src.api.bookings import router as router_bookings
 from src.api.facilities import router as router_facilities
 from src.api.images import router as router_images
+from src.api.availability import router as router_availability
+from src.api.metrics import router as router_metrics
+from src.api.health import router as router_health
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 
 
 logging.basicConfig(level=logging.INFO)
 
-from src.init import redis_manager
+from src.config import settings
+from src.database import async_session_maker, replica_engines
+from src.init import redis_manager, cache_metrics, local_cache, hotels_bloom, rooms_bloom
+from src.utils.cache import (
+    CACHE_PREFIX,
+    CACHE_STATUS_HEADER,
+    OrjsonCoder,
+    TaggedRedisBackend,
+    listen_cache_invalidations,
+    tagged_key_builder,
+)
+from src.utils.db_manager import DBManager
+from src.utils.warmup import warm_up
+
+
+async def fill_bloom_filters():
+    try:
+        async with DBManager(session_factory=async_session_maker) as db:
+            for bloom, repository in ((hotels_bloom, db.hotels), (rooms_bloom, db.rooms)):
+                if not await bloom.is_ready():
+                    await bloom.fill(repository.iter_ids())
+                    logging.info(f"Bloom-фильтр {bloom.key} заполнен")
+    except Exception:
+        logging.exception("Не удалось заполнить bloom-фильтры")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await redis_manager.connect()
-    FastAPICache.init(RedisBackend(redis_manager.redis), prefix="fastapi-cache")
+    FastAPICache.init(
+        TaggedRedisBackend(
+            redis_manager.redis,
+            local_cache,
+            stale_ttl=settings.CACHE_STALE_TTL,
+            lock_timeout=settings.CACHE_LOCK_TIMEOUT,
+        ),
+        prefix=CACHE_PREFIX,
+        coder=OrjsonCoder,
+        key_builder=tagged_key_builder,
+        cache_status_header=CACHE_STATUS_HEADER,
+    )
     logging.info("FastAPI cache initialized")
+    bloom_filling = asyncio.create_task(fill_bloom_filters())
+    app.state.ready = not settings.WARMUP_ENABLED
+    warming_up = asyncio.create_task(warm_up(app)) if settings.WARMUP_ENABLED else None
+    # Инвалидации других воркеров нужны локальному кэшу и выбору между репликой и основной БД
+    invalidation_listener = (
+        asyncio.create_task(listen_cache_invalidations(local_cache))
+        if local_cache is not None or replica_engines
+        else None
+    )
     yield
+    bloom_filling.cancel()
+    if warming_up is not None:
+        warming_up.cancel()
+    if invalidation_listener is not None:
+        invalidation_listener.cancel()
     await redis_manager.close()
 
 
@@ -39,6 +91,29 @@ app.include_router(router_rooms)
 app.include_router(router_bookings)
 app.include_router(router_facilities)
 app.include_router(router_images)
+app.include_router(router_availability)
+app.include_router(router_metrics)
+app.include_router(router_health)
+
+
+@app.middleware("http")
+async def collect_cache_metrics(request: Request, call_next):
+    started_at = time.perf_counter()
+    response = await call_next(request)
+    cache_status = response.headers.get(CACHE_STATUS_HEADER)
+    route = request.scope.get("route")
+    if cache_status and route:
+        cache_metrics.record(route.path, cache_status, time.perf_counter() - started_at)
+    return response
+
+
+@app.middleware("http")
+async def set_etag(request: Request, call_next):
+    response = await call_next(request)
+    etag = getattr(request.state, "etag", None)
+    if etag and response.status_code == 200:
+        response.headers["ETag"] = etag
+    return response
 
 
 @app.get("/docs", include_in_schema=False)
@@ -0,0 +1,59 @@
+"""add room inventory
+
+Revision ID: 3c1f8a6b2d90
+Revises: 88207d63eaab
+Create Date: 2025-02-03 14:15:42.118307
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1f8a6b2d90"
+down_revision: Union[str, None] = "88207d63eaab"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "room_inventory",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("night", sa.Date(), nullable=False),
+        sa.Column("rooms_left", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "room_id", "night", name="uq_room_inventory_room_id_night"
+        ),
+    )
+    op.create_index(
+        "ix_room_inventory_sold_out",
+        "room_inventory",
+        ["night", "room_id"],
+        unique=False,
+        postgresql_where=sa.text("rooms_left <= 0"),
+    )
+    op.execute(
+        """
+        INSERT INTO room_inventory (room_id, night, rooms_left)
+        SELECT booked_nights.room_id, booked_nights.night, rooms.quantity - count(*)
+        FROM (
+            SELECT room_id,
+                   CAST(generate_series(date_from, date_to - 1, interval '1 day') AS DATE) AS night
+            FROM bookings
+        ) AS booked_nights
+        JOIN rooms ON rooms.id = booked_nights.room_id
+        GROUP BY booked_nights.room_id, booked_nights.night, rooms.quantity
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_room_inventory_sold_out", table_name="room_inventory")
+    op.drop_table("room_inventory")
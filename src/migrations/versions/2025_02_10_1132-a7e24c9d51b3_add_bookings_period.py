@@ -0,0 +1,45 @@
+"""add bookings period
+
+Revision ID: a7e24c9d51b3
+Revises: 3c1f8a6b2d90
+Create Date: 2025-02-10 11:32:05.674219
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7e24c9d51b3"
+down_revision: Union[str, None] = "3c1f8a6b2d90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "bookings",
+        sa.Column(
+            "period",
+            postgresql.DATERANGE(),
+            sa.Computed("daterange(date_from, date_to, '[)')", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_bookings_room_id_period",
+        "bookings",
+        ["room_id", "period"],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_room_id_period", table_name="bookings")
+    op.drop_column("bookings", "period")
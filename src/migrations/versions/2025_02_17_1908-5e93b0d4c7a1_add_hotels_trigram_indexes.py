@@ -0,0 +1,42 @@
+"""add hotels trigram indexes
+
+Revision ID: 5e93b0d4c7a1
+Revises: a7e24c9d51b3
+Create Date: 2025-02-17 19:08:51.402736
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e93b0d4c7a1"
+down_revision: Union[str, None] = "a7e24c9d51b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_hotels_title_lower_trgm",
+        "hotels",
+        [sa.text("lower(title) gin_trgm_ops")],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_hotels_location_lower_trgm",
+        "hotels",
+        [sa.text("lower(location) gin_trgm_ops")],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_hotels_location_lower_trgm", table_name="hotels")
+    op.drop_index("ix_hotels_title_lower_trgm", table_name="hotels")
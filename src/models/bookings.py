@@ -1,8 +1,9 @@
 from datetime import date
 
+from sqlalchemy.dialects.postgresql import DATERANGE, Range
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey
+from sqlalchemy import DDL, Computed, ForeignKey, Index, event
 from src.database import Base
 
 
@@ -15,7 +16,21 @@ class BookingsOrm(Base):
     date_from: Mapped[date]
     date_to: Mapped[date]
     price: Mapped[int]
+    period: Mapped[Range[date]] = mapped_column(
+        DATERANGE, Computed("daterange(date_from, date_to, '[)')", persisted=True)
+    )
+
+    __table_args__ = (
+        Index("ix_bookings_room_id_period", "room_id", "period", postgresql_using="gist"),
+    )
 
     @hybrid_property
     def total_cost(self) -> int:
         return self.price * (self.date_to - self.date_from).days
+
+
+event.listen(
+    BookingsOrm.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
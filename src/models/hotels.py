@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String
+from sqlalchemy import DDL, Index, String, event, func
 from src.database import Base
 
 
@@ -9,3 +9,23 @@ class HotelsOrm(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(100))
     location: Mapped[str]
+
+
+Index(
+    "ix_hotels_title_lower_trgm",
+    func.lower(HotelsOrm.title).label("title_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"title_lower": "gin_trgm_ops"},
+)
+Index(
+    "ix_hotels_location_lower_trgm",
+    func.lower(HotelsOrm.location).label("location_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"location_lower": "gin_trgm_ops"},
+)
+
+event.listen(
+    HotelsOrm.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
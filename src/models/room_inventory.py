@@ -0,0 +1,24 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, text
+from src.database import Base
+
+
+class RoomInventoryOrm(Base):
+    __tablename__ = "room_inventory"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"))
+    night: Mapped[date]
+    rooms_left: Mapped[int]
+
+    __table_args__ = (
+        UniqueConstraint("room_id", "night", name="uq_room_inventory_room_id_night"),
+        Index(
+            "ix_room_inventory_sold_out",
+            "night",
+            "room_id",
+            postgresql_where=text("rooms_left <= 0"),
+        ),
+    )
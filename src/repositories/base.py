@@ -1,28 +1,68 @@
-from sqlalchemy import select, insert, delete, update
+from itertools import chain, islice
+from typing import Iterable
+import time
+
+from sqlalchemy import select, insert, delete, update, table, column, text, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import NoResultFound, IntegrityError
 from pydantic import BaseModel
 from asyncpg.exceptions import UniqueViolationError
 from fastapi import HTTPException
 import logging
 
+from src.config import settings
 from src.exceptions import ObjectNotFoundException, ObjectAlreadyExistsException
 from src.repositories.mappers.base import DataMapper
+from src.utils.bloom import BloomFilter
 
 
 class BaseRepository:
     model = None
     mapper: DataMapper = None
+    # Bloom-фильтр id таблицы: каждый путь вставки добавляет в него новые id
+    bloom: BloomFilter | None = None
 
     def __init__(self, session):
         self.session = session
 
+    @property
+    def schema_columns(self):
+        return [self.model.__table__.c[name] for name in self.mapper.schema.model_fields]
+
     async def get_filtred(self, *filter, **filtred_by):
-        query = select(self.model).filter(*filter).filter_by(**filtred_by)
+        # Выбираем только колонки схемы: без гидратации ORM-объектов и identity map,
+        # строки валидируются в схемы одним вызовом
+        query = (
+            select(*self.schema_columns)
+            .select_from(self.model)
+            .filter(*filter)
+            .filter_by(**filtred_by)
+        )
         result = await self.session.execute(query)
 
-        return [
-            self.mapper.map_to_domain_entity(model) for model in result.scalars().all()
-        ]
+        return self.mapper.map_rows_to_domain_entities(tuple(result.keys()), result.all())
+
+    async def iter_filtered(self, *filter, batch_size: int = 1000, **filtred_by):
+        # Серверный курсор: строки приходят пачками по batch_size,
+        # память не зависит от размера таблицы
+        query = (
+            select(*self.schema_columns)
+            .select_from(self.model)
+            .filter(*filter)
+            .filter_by(**filtred_by)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(query)
+        keys = tuple(result.keys())
+        async for rows in result.partitions(batch_size):
+            for entity in self.mapper.map_rows_to_domain_entities(keys, rows):
+                yield entity
+
+    async def iter_ids(self, *filter, batch_size: int = 10000):
+        query = select(self.model.id).filter(*filter).execution_options(yield_per=batch_size)
+        result = await self.session.stream_scalars(query)
+        async for ids in result.partitions(batch_size):
+            yield list(ids)
 
     async def get_all(self, *args, **kwargs):
         return await self.get_filtred()
@@ -50,6 +90,7 @@ class BaseRepository:
             add_data_stmt = insert(self.model).values(**data.model_dump()).returning(self.model)
             result = await self.session.execute(add_data_stmt)
             model = result.scalars().one()
+            await self._add_to_bloom([model.id])
             return self.mapper.map_to_domain_entity(model)
         except IntegrityError as ex:
             logging.exception(
@@ -63,38 +104,185 @@ class BaseRepository:
                 )
                 raise ex
 
-    async def add_bulk(self, data: list[BaseModel]):
-        data_stmt = insert(self.model).values([item.model_dump() for item in data])
-        await self.session.execute(data_stmt)
+    async def add_bulk(
+        self,
+        data: Iterable[BaseModel],
+        chunk_size: int = settings.DB_COPY_CHUNK_SIZE,
+        conflict_columns: list[str] | None = None,
+        update_on_conflict: bool = True,
+    ) -> int:
+        """
+        Загрузка через COPY пачками по chunk_size строк, data может быть генератором.
+        Меньше DB_COPY_MIN_ROWS строк вставляются одним INSERT: для них COPY не окупает
+        лишних обращений к БД. С conflict_columns строки переносятся через INSERT ... ON CONFLICT:
+        обновляют существующие строки или пропускаются. Из строк с одинаковым ключом
+        применяется последняя.
+        """
+        rows = iter(data)
+        head = list(islice(rows, settings.DB_COPY_MIN_ROWS))
+        if not head:
+            return 0
+        columns = list(head[0].model_dump())
+        if len(head) == settings.DB_COPY_MIN_ROWS:
+            return await self._copy_bulk(
+                chain(head, rows), columns, chunk_size, conflict_columns, update_on_conflict
+            )
 
-    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
+        values = [item.model_dump() for item in head]
+        if conflict_columns:
+            # INSERT ... ON CONFLICT не может изменить одну строку дважды
+            values = list(
+                {tuple(row[name] for name in conflict_columns): row for row in values}.values()
+            )
+        add_data_stmt = self._on_conflict(
+            pg_insert(self.model).values(values), columns, conflict_columns, update_on_conflict
+        )
+        if self.bloom is None:
+            await self.session.execute(add_data_stmt)
+        else:
+            result = await self.session.execute(add_data_stmt.returning(self.model.id))
+            await self._add_to_bloom(result.scalars())
+        return len(head)
 
-        result = await self.session.execute(query)
-        items = result.scalars().all()
+    async def _copy_bulk(
+        self,
+        rows: Iterable[BaseModel],
+        columns: list[str],
+        chunk_size: int,
+        conflict_columns: list[str] | None,
+        update_on_conflict: bool,
+    ) -> int:
+        started_at = time.perf_counter()
+        # asyncpg-адаптер SQLAlchemy открывает транзакцию при первом запросе через него:
+        # COPY напрямую через драйвер должен попасть в транзакцию сессии
+        connection = await self.session.connection()
+        if conflict_columns:
+            target = f"{self.model.__tablename__}_staging"
+            await connection.execute(
+                text(
+                    f"CREATE TEMP TABLE {target} ON COMMIT DROP AS "
+                    f"SELECT {', '.join(columns)} FROM {self.model.__tablename__} WITH NO DATA"
+                )
+            )
+        else:
+            target = self.model.__tablename__
+            await connection.execute(select(1))
+        if self.bloom is not None and not conflict_columns:
+            # id из последовательности у загруженных строк будут больше текущего максимума
+            last_id = (
+                await connection.execute(select(func.coalesce(func.max(self.model.id), 0)))
+            ).scalar_one()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        copied = 0
+        rows = iter(rows)
+        while chunk := list(islice(rows, chunk_size)):
+            records = [tuple(item.model_dump().values()) for item in chunk]
+            await driver_connection.copy_records_to_table(
+                target, records=records, columns=columns
+            )
+            copied += len(records)
+            if self.bloom is not None and not conflict_columns and "id" in columns:
+                await self._add_to_bloom(item.id for item in chunk)
+
+        if conflict_columns:
+            staging = table(target, *[column(name) for name in columns], column("ctid"))
+            keys = [staging.c[name] for name in conflict_columns]
+            # Из строк с одинаковым ключом берем последнюю: во временную таблицу
+            # строки только дописываются, поэтому ctid растет в порядке COPY
+            latest_rows = (
+                select(*[staging.c[name] for name in columns])
+                .distinct(*keys)
+                .order_by(*keys, staging.c.ctid.desc())
+            )
+            merge_stmt = self._on_conflict(
+                pg_insert(self.model).from_select(columns, latest_rows),
+                columns,
+                conflict_columns,
+                update_on_conflict,
+            )
+            if self.bloom is None:
+                await connection.execute(merge_stmt)
+            else:
+                result = await connection.execute(merge_stmt.returning(self.model.id))
+                await self._add_to_bloom(result.scalars(), chunk_size)
+            await connection.execute(text(f"DROP TABLE {target}"))
+        elif self.bloom is not None and "id" not in columns:
+            async for ids in self.iter_ids(self.model.id > last_id, batch_size=chunk_size):
+                await self.bloom.add(*ids)
 
-        if len(items) == 0:
+        elapsed = time.perf_counter() - started_at
+        logging.info(
+            f"Загружено {copied} строк в {self.model.__tablename__} за {elapsed:.2f} с "
+            f"({copied / elapsed:.0f} строк/с)"
+        )
+        return copied
+
+    async def _add_to_bloom(self, ids: Iterable[int], chunk_size: int = settings.DB_COPY_CHUNK_SIZE):
+        # До коммита: ложноположительный ответ после отката безопасен, а пропущенный id - нет
+        if self.bloom is None:
+            return
+        ids = iter(ids)
+        while batch := list(islice(ids, chunk_size)):
+            await self.bloom.add(*batch)
+
+    @staticmethod
+    def _on_conflict(stmt, columns: list[str], conflict_columns: list[str] | None, update: bool):
+        if not conflict_columns:
+            return stmt
+        update_columns = [name for name in columns if name not in conflict_columns]
+        if update and update_columns:
+            return stmt.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={name: stmt.excluded[name] for name in update_columns},
+            )
+        return stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+
+    def _map_changed_one(self, result) -> BaseModel:
+        rows = result.all()
+        if len(rows) == 0:
             raise HTTPException(status_code=404, detail="Объект не найден")
-        elif len(items) > 1:
+        elif len(rows) > 1:
             raise HTTPException(status_code=400, detail="Найдено несколько объектов")
+        return self.mapper.map_rows_to_domain_entities(tuple(result.keys()), rows)[0]
 
+    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by):
+        # Одним запросом: число найденных объектов проверяем по строкам из RETURNING,
+        # при ошибке изменения откатываются вместе с транзакцией
         edit_stmt = (
             update(self.model)
             .filter_by(**filter_by)
             .values(**data.model_dump(exclude_unset=exclude_unset))
+            .returning(*self.schema_columns)
         )
-        await self.session.execute(edit_stmt)
+        result = await self.session.execute(edit_stmt)
+        return self._map_changed_one(result)
 
-    async def delete(self, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
-
-        result = await self.session.execute(query)
-        items = result.scalars().all()
+    async def edit_bulk(self, data: BaseModel, ids: list[int], exclude_unset: bool = False):
+        edit_stmt = (
+            update(self.model)
+            .filter(self.model.id.in_(ids))
+            .values(**data.model_dump(exclude_unset=exclude_unset))
+            .returning(*self.schema_columns)
+        )
+        result = await self.session.execute(edit_stmt)
+        return self.mapper.map_rows_to_domain_entities(tuple(result.keys()), result.all())
 
-        if len(items) == 0:
-            raise HTTPException(status_code=404, detail="Объект не найден")
-        elif len(items) > 1:
-            raise HTTPException(status_code=400, detail="Найдено несколько объектов")
+    async def delete(self, **filter_by):
+        delete_stmt = (
+            delete(self.model)
+            .filter_by(**filter_by)
+            .returning(*self.schema_columns)
+        )
+        result = await self.session.execute(delete_stmt)
+        return self._map_changed_one(result)
 
-        delete_stmt = delete(self.model).filter_by(**filter_by)
-        await self.session.execute(delete_stmt)
+    async def delete_bulk(self, ids: list[int]):
+        delete_stmt = (
+            delete(self.model)
+            .filter(self.model.id.in_(ids))
+            .returning(*self.schema_columns)
+        )
+        result = await self.session.execute(delete_stmt)
+        return self.mapper.map_rows_to_domain_entities(tuple(result.keys()), result.all())
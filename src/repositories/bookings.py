@@ -1,19 +1,26 @@
 from sqlalchemy import select
 from datetime import date
-from fastapi import HTTPException
+from typing import Iterable
+from pydantic import BaseModel
 
+from src.config import settings
 from src.exceptions import AllRoomsAreBookedException
 from src.models.bookings import BookingsOrm
+from src.models.rooms import RoomsOrm
 from src.repositories.base import BaseRepository
 from src.repositories.mappers.mappers import BookingDataMapper
-from src.repositories.utils import rooms_ids_for_booking
-from src.schemas.bookings import BookingAdd
+from src.repositories.room_inventory import RoomInventoryRepository
+from src.schemas.bookings import BookingAdd, Booking
 
 
 class BookingsRepository(BaseRepository):
     model = BookingsOrm
     mapper = BookingDataMapper
 
+    def __init__(self, session):
+        super().__init__(session)
+        self.room_inventory = RoomInventoryRepository(session)
+
     async def get_bookings_with_today_checkin(self):
         query = select(BookingsOrm).filter(BookingsOrm.date_to == date.today())
         res = await self.session.execute(query)
@@ -21,16 +28,88 @@ class BookingsRepository(BaseRepository):
             self.mapper.map_to_domain_entity(booking) for booking in res.scalars().all
         ]
 
-    async def add_booking(self, data: BookingAdd, hotel_id: int):
-        rooms_ids_to_get = rooms_ids_for_booking(
-            date_from=data.date_from,
-            date_to=data.date_to,
-            hotel_id=hotel_id,
+    async def get_active_by_hotel(self, hotel_id: int, date_from: date):
+        query = (
+            select(self.model)
+            .join(RoomsOrm, RoomsOrm.id == self.model.room_id)
+            .filter(RoomsOrm.hotel_id == hotel_id, self.model.date_to > date_from)
         )
-        rooms_ids_to_book_res = await self.session.execute(rooms_ids_to_get)
-        rooms_ids_to_book: list[int] = rooms_ids_to_book_res.scalars().all()
-        if data.room_id in rooms_ids_to_book:
-            new_booking = await self.add(data)
-            return new_booking
+        result = await self.session.execute(query)
+        return [
+            self.mapper.map_to_domain_entity(booking) for booking in result.scalars().all()
+        ]
+
+    async def add(self, data: BookingAdd):
+        await self.room_inventory.reserve(data.room_id, data.date_from, data.date_to)
+        return await super().add(data)
+
+    async def add_bulk(
+        self,
+        data: Iterable[BookingAdd],
+        chunk_size: int = settings.DB_COPY_CHUNK_SIZE,
+        conflict_columns: list[str] | None = None,
+        update_on_conflict: bool = True,
+    ) -> int:
+        # Вместо резервирования каждой брони остатки пересчитываются по периоду загруженных
+        # броней. Прежние даты обновляемых броней (conflict_columns) неизвестны,
+        # поэтому при слиянии остатки пересчитываются целиком
+        period = {"date_from": date.max, "date_to": date.min}
+
+        def track_period(bookings: Iterable[BookingAdd]):
+            for booking in bookings:
+                period["date_from"] = min(period["date_from"], booking.date_from)
+                period["date_to"] = max(period["date_to"], booking.date_to)
+                yield booking
+
+        added = await super().add_bulk(
+            track_period(data),
+            chunk_size=chunk_size,
+            conflict_columns=conflict_columns,
+            update_on_conflict=update_on_conflict,
+        )
+        if not added:
+            return 0
+        if conflict_columns:
+            period = {}
+        await self.room_inventory.rebuild(**period)
+        if await self.room_inventory.is_overbooked(**period):
+            raise AllRoomsAreBookedException
+        return added
+
+    async def _move_reservations(self, bookings: list[Booking], updated_bookings: list[Booking]):
+        for booking in bookings:
+            await self.room_inventory.release(
+                booking.room_id, booking.date_from, booking.date_to
+            )
+        for booking in updated_bookings:
+            await self.room_inventory.reserve(
+                booking.room_id, booking.date_from, booking.date_to
+            )
+
+    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by):
+        bookings = await self.get_filtred(**filter_by)
+        updated_booking = await super().edit(data, exclude_unset=exclude_unset, **filter_by)
+        await self._move_reservations(bookings, [updated_booking])
+        return updated_booking
+
+    async def edit_bulk(self, data: BaseModel, ids: list[int], exclude_unset: bool = False):
+        bookings = await self.get_filtred(self.model.id.in_(ids))
+        updated_bookings = await super().edit_bulk(data, ids, exclude_unset=exclude_unset)
+        await self._move_reservations(bookings, updated_bookings)
+        return updated_bookings
+
+    async def delete(self, **filter_by):
+        booking = await super().delete(**filter_by)
+        await self._move_reservations([booking], [])
+        return booking
+
+    async def delete_bulk(self, ids: list[int]):
+        bookings = await super().delete_bulk(ids)
+        await self._move_reservations(bookings, [])
+        return bookings
 
-        raise AllRoomsAreBookedException
+    async def add_booking(self, data: BookingAdd):
+        # Остатки резервируются одним условным upsert'ом: строки room_inventory
+        # блокируются на время транзакции, поэтому параллельные бронирования
+        # последнего номера не приводят к овербукингу
+        return await self.add(data)
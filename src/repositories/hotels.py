@@ -1,18 +1,58 @@
 from datetime import date
+from functools import cache
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, bindparam
 
+from src.init import hotels_bloom
+from src.models.bookings import BookingsOrm
 from src.models.hotels import HotelsOrm
 from src.models.rooms import RoomsOrm
 from src.repositories.base import BaseRepository
 from src.repositories.mappers.mappers import HotelDataMapper
-from src.repositories.utils import rooms_ids_for_booking
+from src.repositories.utils import AVAILABLE_ROOMS_IDS, escape_like
 from src.schemas.hotels import Hotel
 
 
+@cache
+def hotels_search_query(location: bool, title: bool, fuzzy: bool, after_id: bool):
+    """Запрос поиска отелей для набора фильтров: собирается один раз на каждый вариант"""
+    hotels_ids_to_get = (
+        select(RoomsOrm.hotel_id)
+        .select_from(RoomsOrm)
+        .filter(RoomsOrm.id.in_(AVAILABLE_ROOMS_IDS))
+    )
+    query = select(HotelsOrm).filter(HotelsOrm.id.in_(hotels_ids_to_get))
+
+    searched_columns = [
+        (func.lower(column), bindparam(name))
+        for column, name, searched in (
+            (HotelsOrm.location, "location", location),
+            (HotelsOrm.title, "title", title),
+        )
+        if searched
+    ]
+    for column, value in searched_columns:
+        if fuzzy:
+            # Оператор % из pg_trgm: похожесть строк выше pg_trgm.similarity_threshold
+            query = query.filter(column.op("%")(value))
+        else:
+            query = query.filter(column.like(value, escape="/"))
+    if after_id:
+        query = query.filter(HotelsOrm.id > bindparam("after_id")).order_by(HotelsOrm.id)
+    elif fuzzy and searched_columns:
+        query = query.order_by(
+            func.greatest(
+                *[func.similarity(column, value) for column, value in searched_columns]
+            ).desc(),
+            HotelsOrm.id,
+        )
+    return query.limit(bindparam("limit")).offset(bindparam("offset"))
+
+
 class HotelsRepository(BaseRepository):
     model = HotelsOrm
     mapper = HotelDataMapper
+    bloom = hotels_bloom
 
     async def get_filtered_by_time(
         self,
@@ -22,26 +62,39 @@ class HotelsRepository(BaseRepository):
         title,
         limit,
         offset,
+        after_id: int | None = None,
+        fuzzy: bool = False,
     ) -> list[Hotel]:
-        rooms_ids_to_get = rooms_ids_for_booking(date_from=date_from, date_to=date_to)
-        hotels_ids_to_get = (
-            select(RoomsOrm.hotel_id)
-            .select_from(RoomsOrm)
-            .filter(RoomsOrm.id.in_(rooms_ids_to_get))
+        params = {
+            "date_from": date_from,
+            "date_to": date_to,
+            "limit": limit,
+            "offset": offset,
+            "after_id": after_id,
+        }
+        for name, value in (("location", location), ("title", title)):
+            if value:
+                value = value.strip().lower()
+                params[name] = value if fuzzy else f"%{escape_like(value)}%"
+        query = hotels_search_query(
+            "location" in params, "title" in params, fuzzy, after_id is not None
         )
-        query = select(HotelsOrm).filter(HotelsOrm.id.in_(hotels_ids_to_get))
-
-        if location:
-            query = query.filter(
-                func.lower(HotelsOrm.location).contains(location.strip().lower())
-            )
-        if title:
-            query = query.filter(
-                func.lower(HotelsOrm.title).contains(title.strip().lower())
-            )
-        query = query.limit(limit).offset(offset)
-        result = await self.session.execute(query)
+        result = await self.session.execute(query, params)
 
         return [
             self.mapper.map_to_domain_entity(hotel) for hotel in result.scalars().all()
         ]
+
+    async def get_most_booked_ids(self, date_from: date, limit: int) -> list[int]:
+        # Самые популярные отели - с наибольшим числом действующих бронирований
+        query = (
+            select(RoomsOrm.hotel_id)
+            .select_from(BookingsOrm)
+            .join(RoomsOrm, RoomsOrm.id == BookingsOrm.room_id)
+            .filter(BookingsOrm.date_to > date_from)
+            .group_by(RoomsOrm.hotel_id)
+            .order_by(func.count().desc(), RoomsOrm.hotel_id)
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
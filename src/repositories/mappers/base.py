@@ -1,6 +1,7 @@
+from functools import cache
 from typing import TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from src.database import Base
 
@@ -16,6 +17,17 @@ class DataMapper:
     def map_to_domain_entity(cls, data):
         return cls.schema.model_validate(data, from_attributes=True)
 
+    @classmethod
+    def map_rows_to_domain_entities(cls, keys, rows):
+        return _list_adapter(cls.schema).validate_python(
+            [dict(zip(keys, row)) for row in rows]
+        )
+
     @classmethod
     def map_to_persistence_entity(cls, data):
         return cls.db_model(**data.model_dump())
+
+
+@cache
+def _list_adapter(schema: type[SchemaType]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
@@ -1,11 +1,13 @@
 from src.models.bookings import BookingsOrm
 from src.models.facilities import FacilitiesOrm, RoomsFacilitiesOrm
 from src.models.hotels import HotelsOrm
+from src.models.room_inventory import RoomInventoryOrm
 from src.models.rooms import RoomsOrm
 from src.repositories.mappers.base import DataMapper
 from src.schemas.bookings import Booking
 from src.schemas.facilities import Facility, RoomFacility
 from src.schemas.hotels import Hotel
+from src.schemas.room_inventory import RoomInventory
 from src.schemas.rooms import Room, RoomWithRels
 from src.schemas.users import User
 
@@ -43,3 +45,8 @@ class FacilityDataMapper(DataMapper):
 class RoomFacilityDataMapper(DataMapper):
     db_model = RoomsFacilitiesOrm
     schema = RoomFacility
+
+
+class RoomInventoryDataMapper(DataMapper):
+    db_model = RoomInventoryOrm
+    schema = RoomInventory
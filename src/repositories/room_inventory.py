@@ -0,0 +1,119 @@
+from datetime import date
+
+from sqlalchemy import select, update, delete, func, bindparam, exists
+from sqlalchemy.dialects.postgresql import insert
+
+from src.exceptions import AllRoomsAreBookedException
+from src.models.bookings import BookingsOrm
+from src.models.room_inventory import RoomInventoryOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.base import BaseRepository
+from src.repositories.mappers.mappers import RoomInventoryDataMapper
+from src.repositories.utils import nights_between, DATE_FROM, DATE_TO
+
+RESERVE_NIGHTS = (
+    insert(RoomInventoryOrm)
+    .from_select(
+        ["room_id", "night", "rooms_left"],
+        select(
+            RoomsOrm.id,
+            nights_between(DATE_FROM, DATE_TO),
+            RoomsOrm.quantity - 1,
+        )
+        .select_from(RoomsOrm)
+        .filter(RoomsOrm.id == bindparam("room_id"), RoomsOrm.quantity > 0),
+    )
+    .on_conflict_do_update(
+        index_elements=[RoomInventoryOrm.room_id, RoomInventoryOrm.night],
+        set_={"rooms_left": RoomInventoryOrm.rooms_left - 1},
+        where=RoomInventoryOrm.rooms_left > 0,
+    )
+    .returning(RoomInventoryOrm.night)
+)
+
+
+def _nights_in_period(night, date_from: date | None, date_to: date | None) -> list:
+    # Незаданная граница периода - открытый конец
+    conditions = []
+    if date_from is not None:
+        conditions.append(night >= date_from)
+    if date_to is not None:
+        conditions.append(night < date_to)
+    return conditions
+
+
+class RoomInventoryRepository(BaseRepository):
+    model = RoomInventoryOrm
+    mapper = RoomInventoryDataMapper
+
+    async def reserve(self, room_id: int, date_from: date, date_to: date) -> None:
+        result = await self.session.execute(
+            RESERVE_NIGHTS, {"room_id": room_id, "date_from": date_from, "date_to": date_to}
+        )
+        reserved_nights: list[date] = result.scalars().all()
+        if len(reserved_nights) < (date_to - date_from).days:
+            raise AllRoomsAreBookedException
+
+    async def release(self, room_id: int, date_from: date, date_to: date) -> None:
+        release_stmt = (
+            update(self.model)
+            .filter(
+                self.model.room_id == room_id,
+                self.model.night >= date_from,
+                self.model.night < date_to,
+            )
+            .values(rooms_left=self.model.rooms_left + 1)
+        )
+        await self.session.execute(release_stmt)
+
+    async def shift_quantity(self, room_id: int, delta: int) -> None:
+        if not delta:
+            return
+        shift_stmt = (
+            update(self.model)
+            .filter_by(room_id=room_id)
+            .values(rooms_left=self.model.rooms_left + delta)
+        )
+        await self.session.execute(shift_stmt)
+
+    async def rebuild(self, date_from: date | None = None, date_to: date | None = None) -> None:
+        booked_nights = select(
+            BookingsOrm.room_id,
+            nights_between(BookingsOrm.date_from, BookingsOrm.date_to).label("night"),
+        )
+        # daterange с NULL не ограничен с этой стороны
+        if date_from is not None or date_to is not None:
+            booked_nights = booked_nights.filter(
+                BookingsOrm.period.overlaps(func.daterange(date_from, date_to))
+            )
+        delete_stmt = delete(self.model).filter(
+            *_nights_in_period(self.model.night, date_from, date_to)
+        )
+        booked_nights = booked_nights.subquery(name="booked_nights")
+        rooms_left_query = (
+            select(
+                booked_nights.c.room_id,
+                booked_nights.c.night,
+                RoomsOrm.quantity - func.count(),
+            )
+            .select_from(booked_nights)
+            .join(RoomsOrm, RoomsOrm.id == booked_nights.c.room_id)
+            .filter(*_nights_in_period(booked_nights.c.night, date_from, date_to))
+            .group_by(booked_nights.c.room_id, booked_nights.c.night, RoomsOrm.quantity)
+        )
+        await self.session.execute(delete_stmt)
+        await self.session.execute(
+            insert(self.model).from_select(
+                ["room_id", "night", "rooms_left"], rooms_left_query
+            )
+        )
+
+    async def is_overbooked(self, date_from: date | None = None, date_to: date | None = None) -> bool:
+        query = select(
+            exists().where(
+                self.model.rooms_left < 0,
+                *_nights_in_period(self.model.night, date_from, date_to),
+            )
+        )
+        result = await self.session.execute(query)
+        return result.scalar()
@@ -1,19 +1,29 @@
 from datetime import date
 
-from sqlalchemy import select
+from sqlalchemy import select, values, column, Integer, Date
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import selectinload
 
 from src.exceptions import RoomNotFoundException
+from src.init import rooms_bloom
 from src.models.rooms import RoomsOrm
 from src.repositories.base import BaseRepository
 from src.repositories.mappers.mappers import RoomDataMapper, RoomDataWithRelsMapper
-from src.repositories.utils import rooms_ids_for_booking
+from src.repositories.utils import AVAILABLE_HOTEL_ROOMS_IDS, room_is_sold_out
+from src.schemas.availability import AvailabilityRequest
+from src.schemas.rooms import Room
+
+AVAILABLE_HOTEL_ROOMS = (
+    select(RoomsOrm)
+    .options(selectinload(RoomsOrm.facilities))
+    .filter(RoomsOrm.id.in_(AVAILABLE_HOTEL_ROOMS_IDS))
+)
 
 
 class RoomsRepository(BaseRepository):
     model = RoomsOrm
     mapper = RoomDataMapper
+    bloom = rooms_bloom
 
     async def get_filtered_by_time(
         self,
@@ -21,12 +31,55 @@ class RoomsRepository(BaseRepository):
         date_from: date,
         date_to: date,
     ):
-        rooms_ids_to_get = rooms_ids_for_booking(date_from, date_to, hotel_id)
+        result = await self.session.execute(
+            AVAILABLE_HOTEL_ROOMS,
+            {"hotel_id": hotel_id, "date_from": date_from, "date_to": date_to},
+        )
+
+        return [
+            RoomDataWithRelsMapper.map_to_domain_entity(model)
+            for model in result.unique().scalars().all()
+        ]
 
+    async def get_available_batch(
+        self, requests: list[AvailabilityRequest]
+    ) -> list[list[Room]]:
+        requests_table = values(
+            column("idx", Integer),
+            column("hotel_id", Integer),
+            column("date_from", Date),
+            column("date_to", Date),
+            name="requests",
+        ).data(
+            [
+                (idx, request.hotel_id, request.date_from, request.date_to)
+                for idx, request in enumerate(requests)
+            ]
+        )
+        query = (
+            select(requests_table.c.idx, self.model)
+            .select_from(requests_table)
+            .join(self.model, self.model.hotel_id == requests_table.c.hotel_id)
+            .filter(
+                self.model.quantity > 0,
+                ~room_is_sold_out(
+                    self.model.id, requests_table.c.date_from, requests_table.c.date_to
+                ),
+            )
+            .order_by(requests_table.c.idx, self.model.id)
+        )
+        result = await self.session.execute(query)
+
+        available_rooms: list[list[Room]] = [[] for _ in requests]
+        for idx, model in result.all():
+            available_rooms[idx].append(self.mapper.map_to_domain_entity(model))
+        return available_rooms
+
+    async def get_filtred_with_rels(self, **filter_by):
         query = (
             select(self.model)
             .options(selectinload(self.model.facilities))
-            .filter(RoomsOrm.id.in_(rooms_ids_to_get))
+            .filter_by(**filter_by)
         )
         result = await self.session.execute(query)
 
@@ -1,45 +1,44 @@
-from datetime import date
-from sqlalchemy import select, func
-from src.models.bookings import BookingsOrm
+from datetime import timedelta
+from sqlalchemy import select, func, cast, exists, bindparam, Date
+from src.models.room_inventory import RoomInventoryOrm
 from src.models.rooms import RoomsOrm
 
 
-def rooms_ids_for_booking(
-    date_from: date,
-    date_to: date,
-    hotel_id: int | None = None,
-):
-    rooms_count = (
-        select(BookingsOrm.room_id, func.count("*").label("rooms_booked"))
-        .select_from(BookingsOrm)
-        .filter(
-            BookingsOrm.date_from <= date_to,
-            BookingsOrm.date_to >= date_from,
-        )
-        .group_by(BookingsOrm.room_id)
-        .cte(name="rooms_count")
+def nights_between(date_from, date_to):
+    # Ночи проживания: от даты заезда включительно до даты выезда не включительно
+    return cast(
+        func.generate_series(date_from, date_to - timedelta(days=1), timedelta(days=1)),
+        Date,
     )
-    rooms_left_table = (
-        select(
-            RoomsOrm.id.label("room_id"),
-            (RoomsOrm.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)).label(
-                "rooms_left"
-            ),
-        )
-        .select_from(RoomsOrm)
-        .outerjoin(rooms_count, RoomsOrm.id == rooms_count.c.room_id)
-        .cte(name="rooms_left_table")
+
+
+def escape_like(value: str, escape: str = "/") -> str:
+    for char in (escape, "%", "_"):
+        value = value.replace(char, escape + char)
+    return value
+
+
+def room_is_sold_out(room_id, date_from, date_to):
+    return exists().where(
+        RoomInventoryOrm.room_id == room_id,
+        RoomInventoryOrm.night >= date_from,
+        RoomInventoryOrm.night < date_to,
+        RoomInventoryOrm.rooms_left <= 0,
     )
-    rooms_ids_for_hotel = select(RoomsOrm.id).select_from(RoomsOrm)
-    if hotel_id is not None:
-        rooms_ids_for_hotel = rooms_ids_for_hotel.filter_by(hotel_id=hotel_id)
-    rooms_ids_for_hotel = rooms_ids_for_hotel.subquery(name="rooms_ids_for_hotel")
-    rooms_ids_to_get = (
-        select(rooms_left_table.c.room_id)
-        .select_from(rooms_left_table)
-        .filter(
-            rooms_left_table.c.rooms_left > 0,
-            rooms_left_table.c.room_id.in_(rooms_ids_for_hotel),
-        )
+
+
+# Запросы собираются один раз при импорте, значения передаются параметрами при выполнении:
+# SQLAlchemy не строит дерево выражений и не считает ключ кэша компиляции на каждый вызов
+DATE_FROM = bindparam("date_from", type_=Date)
+DATE_TO = bindparam("date_to", type_=Date)
+
+# id номеров, свободных на все ночи с date_from по date_to
+AVAILABLE_ROOMS_IDS = (
+    select(RoomsOrm.id)
+    .select_from(RoomsOrm)
+    .filter(
+        RoomsOrm.quantity > 0,
+        ~room_is_sold_out(RoomsOrm.id, DATE_FROM, DATE_TO),
     )
-    return rooms_ids_to_get
+)
+AVAILABLE_HOTEL_ROOMS_IDS = AVAILABLE_ROOMS_IDS.filter(RoomsOrm.hotel_id == bindparam("hotel_id"))
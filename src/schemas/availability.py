@@ -0,0 +1,15 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+from src.schemas.rooms import Room
+
+
+class AvailabilityRequest(BaseModel):
+    hotel_id: int
+    date_from: date
+    date_to: date
+
+
+class Availability(AvailabilityRequest):
+    rooms: list[Room]
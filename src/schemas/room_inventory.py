@@ -0,0 +1,13 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class RoomInventoryAdd(BaseModel):
+    room_id: int
+    night: date
+    rooms_left: int
+
+
+class RoomInventory(RoomInventoryAdd):
+    id: int
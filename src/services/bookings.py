@@ -1,25 +1,27 @@
-from src.exceptions import ObjectNotFoundException, RoomNotFoundException
+from src.exceptions import ObjectNotFoundException, RoomNotFoundException, check_date_to_after_date_from
+from src.init import availability_engine
 from src.schemas.bookings import BookingAddRequest, BookingAdd
-from src.schemas.hotels import Hotel
 from src.schemas.rooms import Room
 from src.services.base import BaseService
 
 
 class BookingService(BaseService):
     async def add_booking(self, user_id: int, booking_data: BookingAddRequest):
+        check_date_to_after_date_from(booking_data.date_from, booking_data.date_to)
         try:
             room: Room = await self.db.rooms.get_one(id=booking_data.room_id)
         except ObjectNotFoundException as ex:
             raise RoomNotFoundException from ex
-        hotel: Hotel = await self.db.hotels.get_one(id=room.hotel_id)
         room_price: int = room.price
         _booking_data = BookingAdd(
             user_id=user_id,
             price=room_price,
             **booking_data.dict(),
         )
-        booking = await self.db.bookings.add_booking(_booking_data, hotel_id=hotel.id)
+        booking = await self.db.bookings.add_booking(_booking_data)
+        self.db.invalidate_cache("bookings", "hotels", f"rooms:{room.hotel_id}")
         await self.db.commit()
+        availability_engine.add_booking(room.hotel_id, booking)
         return booking
 
 
@@ -28,4 +30,9 @@ class BookingService(BaseService):
 
 
     async def get_my_bookings(self, user_id: int):
-        return await self.db.bookings.get_filtred(user_id=user_id)
\ No newline at end of file
+        return await self.db.bookings.get_filtred(user_id=user_id)
+
+
+    async def iter_bookings(self):
+        async for booking in self.db.bookings.iter_filtered():
+            yield booking
@@ -8,5 +8,6 @@ class FacilityService(BaseService):
 
     async def create_facility(self, data: FacilityAdd):
         facility = await self.db.facilities.add(data)
+        self.db.invalidate_cache("facilities")
         await self.db.commit()
         return facility
\ No newline at end of file
@@ -1,7 +1,9 @@
 from datetime import date
 from src.exceptions import check_date_to_after_date_from, ObjectNotFoundException, HotelNotFoundException
+from src.init import availability_engine
 from src.schemas.hotels import HotelAdd, HotelPatch, Hotel
 from src.services.base import BaseService
+from src.utils.pagination import encode_cursor, decode_cursor
 
 
 class HotelService(BaseService):
@@ -12,9 +14,14 @@ class HotelService(BaseService):
             title: str | None,
             date_from: date,
             date_to: date,
+            fuzzy: bool = False,
     ):
         check_date_to_after_date_from(date_from, date_to)
         per_page = pagination.per_page or 5
+        if pagination.cursor is not None:
+            return await self.get_filtered_by_time_with_cursor(
+                pagination.cursor, per_page, location, title, date_from, date_to, fuzzy
+            )
         return await self.db.hotels.get_filtered_by_time(
             date_from=date_from,
             date_to=date_to,
@@ -22,32 +29,62 @@ class HotelService(BaseService):
             title=title,
             limit=per_page,
             offset=per_page * (pagination.page - 1),
+            fuzzy=fuzzy,
         )
 
 
+    async def get_filtered_by_time_with_cursor(
+            self,
+            cursor: str,
+            per_page: int,
+            location: str | None,
+            title: str | None,
+            date_from: date,
+            date_to: date,
+            fuzzy: bool = False,
+    ):
+        hotels = await self.db.hotels.get_filtered_by_time(
+            date_from=date_from,
+            date_to=date_to,
+            location=location,
+            title=title,
+            limit=per_page + 1,
+            offset=0,
+            after_id=decode_cursor(cursor),
+            fuzzy=fuzzy,
+        )
+        next_cursor = encode_cursor(hotels[per_page - 1].id) if len(hotels) > per_page else None
+        return {"data": hotels[:per_page], "next_cursor": next_cursor}
+
+
     async def get_hotel(self, hotel_id: int):
         return await self.db.hotels.get_one(id=hotel_id)
 
 
     async def add_hotel(self, data: HotelAdd):
         hotel = await self.db.hotels.add(data)
+        self.db.invalidate_cache("hotels", f"hotel:{hotel.id}")
         await self.db.commit()
         return hotel
 
 
     async def edit_hotel(self, hotel_id: int, data: HotelAdd):
         await self.db.hotels.edit(data, id=hotel_id)
+        self.db.invalidate_cache("hotels", f"hotel:{hotel_id}")
         await self.db.commit()
 
 
     async def edit_hotel_partially(self, hotel_id: int, data: HotelPatch, exclude_unset: bool = False):
         await self.db.hotels.edit(data, exclude_unset=exclude_unset, id=hotel_id)
+        self.db.invalidate_cache("hotels", f"hotel:{hotel_id}")
         await self.db.commit()
 
 
     async def delete_hotel(self, hotel_id: int):
         await self.db.hotels.delete(id=hotel_id)
+        self.db.invalidate_cache("hotels", f"hotel:{hotel_id}", f"rooms:{hotel_id}")
         await self.db.commit()
+        availability_engine.invalidate(hotel_id)
 
 
     async def get_hotel_with_check(self, hotel_id: int) -> Hotel:
@@ -1,6 +1,9 @@
 from datetime import date
+from src.config import settings
 from src.exceptions import check_date_to_after_date_from, ObjectNotFoundException, HotelNotFoundException, \
     RoomNotFoundException
+from src.init import availability_engine
+from src.schemas.availability import AvailabilityRequest, Availability
 from src.schemas.facilities import RoomFacilityAdd
 from src.schemas.rooms import RoomAddRequest, Room, RoomAdd, RoomPatchRequest, RoomPatch
 from src.services.base import BaseService
@@ -15,11 +18,29 @@ class RoomService(BaseService):
             date_to: date,
     ):
         check_date_to_after_date_from(date_from, date_to)
+        if settings.AVAILABILITY_ENGINE_ENABLED:
+            rooms = await availability_engine.get_filtered_by_time(
+                self.db, hotel_id, date_from, date_to
+            )
+            if rooms is not None:
+                return rooms
         return await self.db.rooms.get_filtered_by_time(
             hotel_id=hotel_id, date_from=date_from, date_to=date_to
         )
 
 
+    async def get_available_batch(self, requests: list[AvailabilityRequest]) -> list[Availability]:
+        for request in requests:
+            check_date_to_after_date_from(request.date_from, request.date_to)
+        if not requests:
+            return []
+        available_rooms = await self.db.rooms.get_available_batch(requests)
+        return [
+            Availability(**request.model_dump(), rooms=rooms)
+            for request, rooms in zip(requests, available_rooms)
+        ]
+
+
     async def get_room(self, room_id: int, hotel_id: int):
         return await self.db.rooms.get_one_with_rels(id=room_id, hotel_id=hotel_id)
 
@@ -40,7 +61,10 @@ class RoomService(BaseService):
         ]
         if rooms_facilities_data:
             await self.db.rooms_facilities.add_bulk(rooms_facilities_data)
+        self.db.invalidate_cache("hotels", f"rooms:{hotel_id}")
         await self.db.commit()
+        availability_engine.invalidate(hotel_id)
+        return room
 
 
     async def edit_room(
@@ -50,11 +74,14 @@ class RoomService(BaseService):
             room_data: RoomAddRequest,
     ):
         await HotelService(self.db).get_hotel_with_check(hotel_id)
-        await self.get_room_with_check(room_id)
+        room = await self.get_room_with_check(room_id)
         _room_data = RoomAdd(hotel_id=hotel_id, **room_data.model_dump())
         await self.db.rooms.edit(_room_data, id=room_id)
+        await self.db.room_inventory.shift_quantity(room_id, _room_data.quantity - room.quantity)
         await self.db.rooms_facilities.set_room_facilities(room_id, facilities_ids=room_data.facilities_ids)
+        self.db.invalidate_cache("hotels", f"rooms:{hotel_id}")
         await self.db.commit()
+        availability_engine.invalidate(hotel_id)
 
 
     async def partially_edit_room(
@@ -64,22 +91,28 @@ class RoomService(BaseService):
             room_data: RoomPatchRequest,
     ):
         await HotelService(self.db).get_hotel_with_check(hotel_id)
-        await self.get_room_with_check(room_id)
+        room = await self.get_room_with_check(room_id)
         _room_data_dict = room_data.model_dump(exclude_unset=True)
         _room_data = RoomPatch(hotel_id=hotel_id, **_room_data_dict)
         await self.db.rooms.edit(_room_data, exclude_unset=True, id=room_id, hotel_id=hotel_id)
+        if _room_data.quantity is not None:
+            await self.db.room_inventory.shift_quantity(room_id, _room_data.quantity - room.quantity)
         if "facilities_ids" in _room_data_dict:
             await self.db.rooms_facilities.set_room_facilities(
                 room_id, facilities_ids=_room_data_dict["facilities_ids"]
             )
+        self.db.invalidate_cache("hotels", f"rooms:{hotel_id}")
         await self.db.commit()
+        availability_engine.invalidate(hotel_id)
 
 
     async def delete_room(self, hotel_id: int, room_id: int):
         await HotelService(self.db).get_hotel_with_check(hotel_id)
         await self.get_room_with_check(room_id)
         await self.db.rooms.delete(id=room_id, hotel_id=hotel_id)
+        self.db.invalidate_cache("hotels", f"rooms:{hotel_id}")
         await self.db.commit()
+        availability_engine.invalidate(hotel_id)
 
 
     async def get_room_with_check(self, room_id: int) -> Room:
@@ -14,3 +14,9 @@ celery_instance.conf.beat_schedule = {
         "schedule": 5,
     }
 }
+
+if settings.PRECOMPUTE_ENABLED:
+    celery_instance.conf.beat_schedule["precompute_hotel_searches"] = {
+        "task": "precompute_hotel_searches",
+        "schedule": settings.PRECOMPUTE_INTERVAL,
+    }
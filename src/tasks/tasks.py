@@ -1,11 +1,25 @@
 import asyncio
 import logging
+from datetime import date
 from PIL import Image
 import os
 
+from src.api.dependencies import PaginationParams
+from src.api.hotels import get_hotels
+from src.config import settings
 from src.database import async_session_maker_null_pool
+from src.init import hotels_bloom, redis_manager, rooms_bloom
+from src.services.hotels import HotelService
 from src.tasks.celery_app import celery_instance
+from src.utils.cache import (
+    CACHE_PREFIX,
+    OrjsonCoder,
+    TaggedRedisBackend,
+    get_cache_tag_version,
+    tagged_key_builder,
+)
 from src.utils.db_manager import DBManager
+from src.utils.search_windows import SearchWindow, get_precompute_windows
 
 
 @celery_instance.task
@@ -41,3 +55,103 @@ async def get_bookings_with_today_checkin_helper():
 @celery_instance.task(name="booking_today_checkin")
 def send_emails_to_users_with_today_checkin():
     asyncio.run(get_bookings_with_today_checkin_helper())
+
+
+async def rebuild_room_inventory_helper(date_from: date | None = None, date_to: date | None = None):
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        await db.room_inventory.rebuild(date_from=date_from, date_to=date_to)
+        await db.commit()
+        logging.info(f"Остатки номеров пересчитаны по бронированиям: {date_from=}, {date_to=}")
+
+
+@celery_instance.task(name="rebuild_room_inventory")
+def rebuild_room_inventory(date_from: str | None = None, date_to: str | None = None):
+    asyncio.run(
+        rebuild_room_inventory_helper(
+            date_from=date.fromisoformat(date_from) if date_from else None,
+            date_to=date.fromisoformat(date_to) if date_to else None,
+        )
+    )
+
+
+async def refill_bloom_filters_helper():
+    await redis_manager.connect()
+    try:
+        async with DBManager(session_factory=async_session_maker_null_pool) as db:
+            for bloom, repository in ((hotels_bloom, db.hotels), (rooms_bloom, db.rooms)):
+                await bloom.fill(repository.iter_ids())
+                logging.info(f"Bloom-фильтр {bloom.key} дополнен id из БД")
+    finally:
+        await redis_manager.close()
+
+
+@celery_instance.task(name="refill_bloom_filters")
+def refill_bloom_filters():
+    # Запускать после миграций и загрузок, которые вставляли строки в обход репозиториев
+    asyncio.run(refill_bloom_filters_helper())
+
+
+def hotels_search_cache_key(window: SearchWindow) -> str:
+    # Тот же ключ, что у GET /hotels?location=...&date_from=...&date_to=...
+    return tagged_key_builder(
+        get_hotels,
+        f"{CACHE_PREFIX}:hotels",
+        args=(),
+        kwargs={
+            "pagination": PaginationParams(),
+            "location": window.location,
+            "title": None,
+            "date_from": window.date_from,
+            "date_to": window.date_to,
+            "fuzzy": False,
+        },
+    )
+
+
+async def precompute_hotel_searches_helper(date_from: date | None = None, date_to: date | None = None):
+    await redis_manager.connect()
+    try:
+        backend = TaggedRedisBackend(redis_manager.redis, stale_ttl=settings.CACHE_STALE_TTL)
+        windows = await get_precompute_windows(date.today())
+        if date_from and date_to:
+            windows = [window for window in windows if window.overlaps(date_from, date_to)]
+        written = 0
+        async with DBManager(session_factory=async_session_maker_null_pool) as db:
+            for window in windows:
+                # Если тег сбросили во время расчета, результат мог устареть: не записываем
+                version = await get_cache_tag_version("hotels")
+                hotels = await HotelService(db).get_filtered_by_time(
+                    PaginationParams(), window.location, None, window.date_from, window.date_to
+                )
+                written += await backend.set_if_tag_unchanged(
+                    hotels_search_cache_key(window),
+                    OrjsonCoder.encode(hotels),
+                    settings.CACHE_EXPIRE,
+                    version,
+                )
+        logging.info(f"Предвычислено поисков отелей: {written} из {len(windows)}")
+    finally:
+        await redis_manager.close()
+
+
+@celery_instance.task(name="precompute_hotel_searches")
+def precompute_hotel_searches(date_from: str | None = None, date_to: str | None = None):
+    asyncio.run(
+        precompute_hotel_searches_helper(
+            date_from=date.fromisoformat(date_from) if date_from else None,
+            date_to=date.fromisoformat(date_to) if date_to else None,
+        )
+    )
+
+
+async def enqueue_precompute_hotel_searches(date_from: date, date_to: date) -> None:
+    # delay() блокирует на время обращения к брокеру: вызываем его вне event loop,
+    # а ошибка брокера не должна влиять на уже сохраненную бронь
+    try:
+        await asyncio.to_thread(
+            precompute_hotel_searches.delay, date_from.isoformat(), date_to.isoformat()
+        )
+    except Exception:
+        logging.exception(
+            f"Не удалось поставить задачу предвычисления поисков отелей: {date_from=}, {date_to=}"
+        )
@@ -0,0 +1,96 @@
+import time
+from collections import Counter, OrderedDict, defaultdict
+from datetime import date, timedelta
+
+from src.schemas.bookings import Booking
+from src.schemas.rooms import RoomWithRels
+
+
+def _nights(date_from: date, date_to: date):
+    for days in range((date_to - date_from).days):
+        yield date_from + timedelta(days=days)
+
+
+class HotelAvailability:
+    """Номера отеля и число забронированных номеров на каждую ночь начиная с loaded_from"""
+
+    def __init__(self, rooms: list[RoomWithRels], bookings: list[Booking], loaded_from: date):
+        self.rooms = {room.id: room for room in sorted(rooms, key=lambda room: room.id)}
+        self.booked: dict[int, Counter[date]] = defaultdict(Counter)
+        self.loaded_from = loaded_from
+        self.loaded_at = time.monotonic()
+        for booking in bookings:
+            self.add_booking(booking)
+
+    def add_booking(self, booking: Booking) -> None:
+        for night in _nights(max(booking.date_from, self.loaded_from), booking.date_to):
+            self.booked[booking.room_id][night] += 1
+
+    def get_available_rooms(self, date_from: date, date_to: date) -> list[RoomWithRels]:
+        available_rooms = []
+        for room in self.rooms.values():
+            booked_nights = self.booked[room.id]
+            max_booked = max(
+                (booked_nights[night] for night in _nights(date_from, date_to)), default=0
+            )
+            if room.quantity - max_booked > 0:
+                available_rooms.append(room)
+        return available_rooms
+
+
+class AvailabilityEngine:
+    """
+    Доступность номеров в памяти процесса для самых запрашиваемых отелей.
+
+    Отели загружаются лениво из БД и вытесняются по LRU, когда их больше max_hotels.
+    Бронирования этого процесса применяются сразу, бронирования других воркеров
+    становятся видны после перезагрузки отеля, не позже чем через ttl секунд.
+    """
+
+    def __init__(self, max_hotels: int, ttl: int):
+        self.max_hotels = max_hotels
+        self.ttl = ttl
+        self._hotels: OrderedDict[int, HotelAvailability] = OrderedDict()
+        self._versions: Counter[int] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._hotels)
+
+    def __contains__(self, hotel_id: int) -> bool:
+        return hotel_id in self._hotels
+
+    async def get_filtered_by_time(
+        self, db, hotel_id: int, date_from: date, date_to: date
+    ) -> list[RoomWithRels] | None:
+        if date_from < date.today():
+            return None
+        hotel = self._hotels.get(hotel_id)
+        if hotel is None or time.monotonic() - hotel.loaded_at > self.ttl:
+            hotel = await self._load(db, hotel_id)
+        else:
+            self._hotels.move_to_end(hotel_id)
+        return hotel.get_available_rooms(date_from, date_to)
+
+    def add_booking(self, hotel_id: int, booking: Booking) -> None:
+        self._versions[hotel_id] += 1
+        hotel = self._hotels.get(hotel_id)
+        if hotel is not None:
+            hotel.add_booking(booking)
+
+    def invalidate(self, hotel_id: int) -> None:
+        self._versions[hotel_id] += 1
+        self._hotels.pop(hotel_id, None)
+
+    async def _load(self, db, hotel_id: int) -> HotelAvailability:
+        version = self._versions[hotel_id]
+        loaded_from = date.today()
+        rooms = await db.rooms.get_filtred_with_rels(hotel_id=hotel_id)
+        bookings = await db.bookings.get_active_by_hotel(hotel_id, loaded_from)
+        hotel = HotelAvailability(rooms, bookings, loaded_from)
+        # Если за время загрузки отель изменился, снимок может быть неактуальным
+        if self._versions[hotel_id] == version:
+            self._hotels[hotel_id] = hotel
+            self._hotels.move_to_end(hotel_id)
+            while len(self._hotels) > self.max_hotels:
+                self._hotels.popitem(last=False)
+        return hotel
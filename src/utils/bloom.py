@@ -0,0 +1,69 @@
+import hashlib
+import logging
+from typing import AsyncIterable
+
+
+class BloomFilter:
+    """
+    Bloom-фильтр id в битовой строке Redis (SETBIT/GETBIT).
+
+    Биты только добавляются, поэтому удаленные id продолжают "возможно существовать".
+    Заполненный фильтр (выставлен бит готовности) считается полным: отрицательный ответ
+    окончательный. Полноту держат репозитории - каждый путь вставки добавляет новые id.
+    Строки, вставленные без подключения к Redis или в обход репозиториев (миграции),
+    нужно дописать задачей refill_bloom_filters. Пока фильтр не заполнен,
+    might_contain всегда отвечает True.
+    """
+
+    def __init__(self, redis_manager, name: str, size: int, hashes: int):
+        self.redis_manager = redis_manager
+        self.key = f"bloom:{name}"
+        self.size = size
+        self.hashes = hashes
+
+    def _offsets(self, item: int) -> list[int]:
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    async def add(self, *items: int) -> None:
+        if not items or self.redis_manager.redis is None:
+            return
+        try:
+            async with self.redis_manager.pipeline() as pipe:
+                for item in items:
+                    for offset in self._offsets(item):
+                        pipe.setbit(self.key, offset, 1)
+                await pipe.execute()
+        except Exception:
+            logging.exception(f"Не удалось добавить id в bloom-фильтр {self.key}")
+            # Фильтр без этих id больше не полон: не доверяем ему до повторного заполнения
+            try:
+                await self.redis_manager.redis.setbit(self.key, self.size, 0)
+            except Exception:
+                logging.exception(f"Не удалось сбросить готовность bloom-фильтра {self.key}")
+
+    async def might_contain(self, item: int) -> bool:
+        if self.redis_manager.redis is None:
+            return True
+        try:
+            async with self.redis_manager.pipeline() as pipe:
+                # Последний бит после битов фильтра - признак готовности
+                pipe.getbit(self.key, self.size)
+                for offset in self._offsets(item):
+                    pipe.getbit(self.key, offset)
+                ready, *bits = await pipe.execute()
+        except Exception:
+            logging.exception(f"Не удалось проверить id в bloom-фильтре {self.key}")
+            return True
+        return not ready or all(bits)
+
+    async def is_ready(self) -> bool:
+        return bool(await self.redis_manager.redis.getbit(self.key, self.size))
+
+    async def fill(self, batches: AsyncIterable[list[int]]) -> None:
+        # id, созданные во время заполнения, добавляются репозиториями сами
+        async for ids in batches:
+            await self.add(*ids)
+        await self.redis_manager.redis.setbit(self.key, self.size, 1)
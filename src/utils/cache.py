@@ -0,0 +1,422 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from contextvars import ContextVar
+from datetime import date
+from functools import wraps
+from typing import Any, Callable
+
+import orjson
+from fastapi_cache import decorator as fastapi_cache_decorator
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.coder import Coder
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+from redis.exceptions import WatchError
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.init import redis_manager, local_cache
+from src.utils.local_cache import LocalCache
+
+CACHE_PREFIX = "fastapi-cache"
+CACHE_TAGS_PREFIX = f"{CACHE_PREFIX}-tags"
+CACHE_STATUS_HEADER = "X-FastAPI-Cache"
+CACHE_INVALIDATION_CHANNEL = f"{CACHE_PREFIX}-invalidation"
+CACHE_LOCKS_PREFIX = f"{CACHE_PREFIX}-lock"
+CACHE_VERSIONS_PREFIX = f"{CACHE_PREFIX}-version"
+CACHE_MISSING_PREFIX = f"{CACHE_PREFIX}-missing"
+CACHE_LOCK_POLL_INTERVAL = 0.05
+# Меньше socket_timeout пула Redis: ожидание сообщения без таймаута сокета и переподключений
+CACHE_INVALIDATION_POLL_TIMEOUT = 1.0
+CACHE_KEY_PARAM_TYPES = (str, int, float, date, BaseModel)
+
+# Удаляет все ключи, записанные под тегами KEYS, и сами множества тегов
+PURGE_TAGS_SCRIPT = """
+for _, tag_key in ipairs(KEYS) do
+    local keys = redis.call('SMEMBERS', tag_key)
+    for i = 1, #keys, 1000 do
+        redis.call('DEL', unpack(keys, i, math.min(i + 999, #keys)))
+    end
+    redis.call('DEL', tag_key)
+end
+return #KEYS
+"""
+
+
+# Response, который fastapi-cache передает в key_builder: в него декоратор пишет заголовки кэша
+cache_response: ContextVar[Response | None] = ContextVar("cache_response", default=None)
+
+# Ключ, который пересчитывает текущий запрос, и бэкенд, в котором его ждут остальные
+cache_flight: ContextVar[tuple["TaggedRedisBackend", str] | None] = ContextVar(
+    "cache_flight", default=None
+)
+
+
+# Версия тега, по которой conditional_get выдал ETag: под ней ответ хранится в памяти воркера,
+# чтобы до прихода инвалидации по pub/sub не отдать старое тело с новым ETag
+cache_tag_version: ContextVar[str | None] = ContextVar("cache_tag_version", default=None)
+
+
+# Время последней инвалидации, о которой знает воркер: своей или полученной по pub/sub
+_last_invalidation_at = float("-inf")
+
+
+def mark_invalidated() -> None:
+    global _last_invalidation_at
+    _last_invalidation_at = time.monotonic()
+
+
+def invalidated_within(seconds: float) -> bool:
+    return time.monotonic() - _last_invalidation_at < seconds
+
+
+def tag_key(tag: str) -> str:
+    return f"{CACHE_TAGS_PREFIX}:{tag}"
+
+
+def lock_key(key: str) -> str:
+    return f"{CACHE_LOCKS_PREFIX}:{key}"
+
+
+def version_key(tag: str) -> str:
+    return f"{CACHE_VERSIONS_PREFIX}:{tag}"
+
+
+def missing_key(tag: str, entity_id: int) -> str:
+    return f"{CACHE_MISSING_PREFIX}:{tag}:{entity_id}"
+
+
+def key_tag(key: str) -> str:
+    # Ключ имеет вид "{CACHE_PREFIX}:{тег}:{хэш}"
+    return key[len(CACHE_PREFIX) + 1:key.rindex(":")]
+
+
+def local_key(key: str) -> str:
+    version = cache_tag_version.get()
+    return f"{key}@{version}" if version else key
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return if_none_match == "*" or etag in {value.strip() for value in if_none_match.split(",")}
+
+
+def build_cache_key(namespace: str, route: str, params: dict[str, Any]) -> str:
+    params_hash = hashlib.md5(  # noqa: S324
+        json.dumps([route, params], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{namespace}:{params_hash}"
+
+
+def normalize_cache_params(kwargs: dict[str, Any]) -> dict[str, Any]:
+    # В ключ попадают только параметры запроса (path, query, id пользователя),
+    # внедренные зависимости вроде DBManager отбрасываются
+    return {
+        name: value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+        for name, value in kwargs.items()
+        if value is None or isinstance(value, CACHE_KEY_PARAM_TYPES)
+    }
+
+
+def tagged_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Request | None = None,
+    response: Response | None = None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> str:
+    cache_response.set(response)
+    # namespace эндпоинта - это тег, например "rooms:{hotel_id}": подставляем параметры пути
+    return build_cache_key(
+        namespace.format(**kwargs),
+        f"{func.__module__}:{func.__name__}",
+        normalize_cache_params(kwargs),
+    )
+
+
+def cache(expire: int | None = None, namespace: str = ""):
+    """
+    Декоратор кэша fastapi-cache: если эндпоинт, пересчитывающий ключ, упал,
+    пересчет отпускается, и ожидающие запросы сразу считают ответ сами
+    """
+
+    def wrapper(func):
+        cached = fastapi_cache_decorator.cache(expire=expire, namespace=namespace)(func)
+
+        @wraps(cached)
+        async def inner(*args, **kwargs):
+            token = cache_flight.set(None)
+            try:
+                return await cached(*args, **kwargs)
+            except BaseException:
+                flight = cache_flight.get()
+                if flight is not None:
+                    backend, key = flight
+                    await backend.abandon(key)
+                raise
+            finally:
+                cache_flight.reset(token)
+
+        return inner
+
+    return wrapper
+
+
+class OrjsonCoder(Coder):
+    """
+    Хранит в кэше готовое тело JSON-ответа.
+
+    При попадании тело отдается как есть, без декодирования и повторной сериализации.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        if isinstance(value, Response):
+            return value.body
+        return orjson.dumps(value, default=to_jsonable_python)
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        return orjson.loads(value)
+
+    @classmethod
+    def decode_as_type(cls, value: bytes, *, type_: Any) -> Response:
+        # FastAPI не переносит заголовки внедренного response в возвращенный Response
+        response = cache_response.get()
+        headers = dict(response.headers) if response is not None else None
+        if headers is not None:
+            headers.pop("content-length", None)
+        return Response(content=value, headers=headers, media_type="application/json")
+
+
+class TaggedRedisBackend(RedisBackend):
+    """
+    Запоминает ключи кэша в множествах по тегам, чтобы их можно было сбросить после записи в БД.
+    Если передан local_cache, ответы сначала ищутся в памяти воркера, и только потом в Redis.
+
+    При промахе ответ пересчитывает только один запрос на ключ: в пределах воркера остальные
+    ждут его результата, между воркерами пересчет защищен блокировкой в Redis. Значения хранятся
+    в Redis еще stale_ttl секунд после истечения, и пока идет пересчет, отдается устаревший ответ.
+    """
+
+    def __init__(
+        self,
+        redis,
+        local_cache: LocalCache | None = None,
+        stale_ttl: int = 0,
+        lock_timeout: float = 5,
+    ):
+        super().__init__(redis)
+        self.local_cache = local_cache
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self._flights: dict[str, tuple[asyncio.Future, float]] = {}
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        ttl, value, fresh = await self._get_with_ttl(key)
+        if fresh:
+            return ttl, value
+
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is not None and loop.time() - flight[1] < self.lock_timeout:
+            if value is not None:
+                return 0, value
+            try:
+                return await asyncio.wait_for(asyncio.shield(flight[0]), self.lock_timeout)
+            except asyncio.TimeoutError:
+                return 0, None
+
+        if not await self._acquire_lock(key):
+            if value is not None:
+                return 0, value
+            return await self._wait_for_value(key)
+        self._flights[key] = (loop.create_future(), loop.time())
+        cache_flight.set((self, key))
+        return 0, None
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        tag = key_tag(key)
+        generation = self.local_cache.tag_generation(tag) if self.local_cache else None
+        redis_expire = expire + self.stale_ttl if expire else None
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, value, ex=redis_expire)
+                pipe.sadd(tag_key(tag), key)
+                if redis_expire:
+                    pipe.expire(tag_key(tag), redis_expire)
+                pipe.delete(lock_key(key))
+                await pipe.execute()
+            if self.local_cache is not None:
+                self.local_cache.set(local_key(key), value, tag, expire, generation)
+        finally:
+            # Ожидающим отдаем ответ, даже если записать его в Redis не удалось
+            self._finish_flight(key, (expire or 0, value))
+
+    async def abandon(self, key: str) -> None:
+        """Отпускает пересчет ключа, который не завершился записью ответа"""
+        self._finish_flight(key, (0, None))
+        try:
+            await self.redis.delete(lock_key(key))
+        except Exception:
+            logging.exception(f"Не удалось снять блокировку пересчета кэша {key}")
+
+    def _finish_flight(self, key: str, result: tuple[int, bytes | None]) -> None:
+        flight = self._flights.pop(key, None)
+        if flight is not None and not flight[0].done():
+            flight[0].set_result(result)
+        current = cache_flight.get()
+        if current is not None and current[1] == key:
+            cache_flight.set(None)
+
+    async def set_if_tag_unchanged(self, key: str, value: bytes, expire: int, version: str) -> bool:
+        """Записывает ответ, только если тег ключа не сбрасывали с момента чтения его версии"""
+        tag = key_tag(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(version_key(tag))
+                current = await pipe.get(version_key(tag))
+                if current is None or current.decode() != version:
+                    return False
+                pipe.multi()
+                pipe.set(key, value, ex=expire + self.stale_ttl)
+                pipe.sadd(tag_key(tag), key)
+                pipe.expire(tag_key(tag), expire + self.stale_ttl)
+                await pipe.execute()
+            except WatchError:
+                return False
+        return True
+
+    async def _get_with_ttl(self, key: str) -> tuple[int, bytes | None, bool]:
+        if self.local_cache is not None:
+            ttl, value = self.local_cache.get_with_ttl(local_key(key))
+            if value is not None:
+                return ttl, value, True
+            tag = key_tag(key)
+            generation = self.local_cache.tag_generation(tag)
+        ttl, value = await super().get_with_ttl(key)
+        if value is None:
+            return 0, None, False
+        if ttl > 0:
+            # Последние stale_ttl секунд жизни ключа значение считается устаревшим
+            ttl -= self.stale_ttl
+            if ttl <= 0:
+                return 0, value, False
+        if self.local_cache is not None:
+            self.local_cache.set(local_key(key), value, tag, ttl if ttl > 0 else None, generation)
+        return ttl, value, True
+
+    async def _acquire_lock(self, key: str) -> bool:
+        return bool(
+            await self.redis.set(lock_key(key), 1, nx=True, px=int(self.lock_timeout * 1000))
+        )
+
+    async def _wait_for_value(self, key: str) -> tuple[int, bytes | None]:
+        # Ответ пересчитывает другой воркер: ждем его, а по таймауту считаем сами
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+            ttl, value = await super().get_with_ttl(key)
+            if value is not None:
+                return max(ttl - self.stale_ttl, 0), value
+        return 0, None
+
+
+async def invalidate_cache_tags(*tags: str) -> None:
+    if not tags:
+        return
+    mark_invalidated()
+    if local_cache is not None:
+        local_cache.invalidate_tags(*tags)
+    if redis_manager.redis is None:
+        return
+    try:
+        async with redis_manager.pipeline() as pipe:
+            pipe.eval(PURGE_TAGS_SCRIPT, len(tags), *[tag_key(tag) for tag in tags])
+            pipe.mset({version_key(tag): time.time_ns() for tag in tags})
+            pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(tags))
+            await pipe.execute()
+    except Exception:
+        logging.exception(f"Не удалось сбросить кэш по тегам {tags}")
+
+
+async def cache_missing(tag: str, entity_id: int, expire: int) -> None:
+    """
+    Запоминает, что объекта с entity_id не нашлось. Запись хранит версию тега
+    и перестает действовать, как только тег сбросят
+    """
+    version = await get_cache_tag_version(tag)
+    if version is None:
+        return
+    try:
+        await redis_manager.set(missing_key(tag, entity_id), version, expire)
+    except Exception:
+        logging.exception(f"Не удалось запомнить отсутствие объекта {entity_id} по тегу {tag}")
+
+
+async def is_cached_missing(tag: str, entity_id: int) -> bool:
+    if redis_manager.redis is None:
+        return False
+    try:
+        version, missing = await redis_manager.mget([version_key(tag), missing_key(tag, entity_id)])
+        return missing is not None and missing == version
+    except Exception:
+        logging.exception(f"Не удалось проверить отсутствие объекта {entity_id} по тегу {tag}")
+        return False
+
+
+async def get_cache_tag_version(tag: str) -> str | None:
+    """
+    Версия данных с тегом: меняется при каждом сбросе тега после записи в БД.
+    Если версии еще нет, она создается, а не начинается заново со счетчика,
+    чтобы после потери ключа в Redis не повторились старые версии.
+    """
+    if redis_manager.redis is None:
+        return None
+    try:
+        async with redis_manager.pipeline() as pipe:
+            pipe.set(version_key(tag), time.time_ns(), nx=True)
+            pipe.get(version_key(tag))
+            _, version = await pipe.execute()
+    except Exception:
+        logging.exception(f"Не удалось получить версию кэша по тегу {tag}")
+        return None
+    return version.decode()
+
+
+async def listen_cache_invalidations(cache: LocalCache | None) -> None:
+    """Сбрасывает локальный кэш воркера по тегам, инвалидированным в других воркерах"""
+    reconnecting = False
+    while True:
+        pubsub = redis_manager.redis.pubsub()
+        try:
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            if reconnecting:
+                # Пока подписка была потеряна, сообщения могли не дойти
+                mark_invalidated()
+                if cache is not None:
+                    cache.clear()
+                reconnecting = False
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=CACHE_INVALIDATION_POLL_TIMEOUT
+                )
+                if message is not None and message["type"] == "message":
+                    mark_invalidated()
+                    if cache is not None:
+                        cache.invalidate_tags(*json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Потеряна подписка на инвалидацию кэша, переподключаюсь")
+            reconnecting = True
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
@@ -1,29 +1,96 @@
+from functools import cached_property
+
+from sqlalchemy import event
+
+from src.database import get_replica_engine
+from src.exceptions import ReadOnlyDBManagerException
 from src.repositories.users import UsersRepository
 from src.repositories.hotels import HotelsRepository
 from src.repositories.rooms import RoomsRepository
 from src.repositories.bookings import BookingsRepository
 from src.repositories.facilities import FacilitiesRepository, RoomsFacilitiesRepository
+from src.repositories.room_inventory import RoomInventoryRepository
+from src.utils.cache import invalidate_cache_tags
+
+
+def _forbid_writes(orm_execute_state):
+    if not orm_execute_state.is_select:
+        raise ReadOnlyDBManagerException
 
 
 class DBManager:
-    def __init__(self, session_factory):
-        self.session_factory = session_factory
+    """
+    Сессия и репозитории создаются при первом обращении: запросы, которые отдаются
+    из кэша, не открывают сессию и не берут соединение из пула.
 
-    async def __aenter__(self):
-        self.session = self.session_factory()
+    read_only=True - для GET-запросов с фабрикой сессий в режиме AUTOCOMMIT: без BEGIN
+    и ROLLBACK на каждый запрос, любые изменения через такую сессию запрещены.
+    Такая сессия при use_replica=True читает с реплики, если реплики настроены.
+    """
 
-        self.users = UsersRepository(self.session)
-        self.hotels = HotelsRepository(self.session)
-        self.rooms = RoomsRepository(self.session)
-        self.bookings = BookingsRepository(self.session)
-        self.facilities = FacilitiesRepository(self.session)
-        self.rooms_facilities = RoomsFacilitiesRepository(self.session)
+    def __init__(self, session_factory, read_only: bool = False, use_replica: bool = False):
+        self.session_factory = session_factory
+        self.read_only = read_only
+        self.use_replica = read_only and use_replica
+        self.cache_tags: set[str] = set()
+        self._session = None
 
+    async def __aenter__(self):
         return self
 
     async def __aexit__(self, *args):
-        await self.session.rollback()
-        await self.session.close()
+        if self._session is None:
+            return
+        if not self.read_only:
+            await self._session.rollback()
+        await self._session.close()
+
+    @property
+    def session(self):
+        if self._session is None:
+            replica = get_replica_engine() if self.use_replica else None
+            self._session = (
+                self.session_factory(bind=replica) if replica else self.session_factory()
+            )
+            if self.read_only:
+                event.listen(self._session.sync_session, "do_orm_execute", _forbid_writes)
+        return self._session
+
+    @cached_property
+    def users(self):
+        return UsersRepository(self.session)
+
+    @cached_property
+    def hotels(self):
+        return HotelsRepository(self.session)
+
+    @cached_property
+    def rooms(self):
+        return RoomsRepository(self.session)
+
+    @cached_property
+    def bookings(self):
+        return BookingsRepository(self.session)
+
+    @cached_property
+    def facilities(self):
+        return FacilitiesRepository(self.session)
+
+    @cached_property
+    def rooms_facilities(self):
+        return RoomsFacilitiesRepository(self.session)
+
+    @cached_property
+    def room_inventory(self):
+        return RoomInventoryRepository(self.session)
+
+    def invalidate_cache(self, *tags: str):
+        # Теги сбрасываются только после успешного коммита
+        self.cache_tags.update(tags)
 
     async def commit(self):
+        if self.read_only:
+            raise ReadOnlyDBManagerException
         await self.session.commit()
+        cache_tags, self.cache_tags = self.cache_tags, set()
+        await invalidate_cache_tags(*cache_tags)
@@ -0,0 +1,41 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который считает время получения соединения и таймауты ожидания"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_time = 0.0
+        self.max_checkout_time = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        # Включает ожидание свободного соединения и открытие нового сверх pool_size
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self.checkouts += 1
+            self.checkout_time += elapsed
+            self.max_checkout_time = max(self.max_checkout_time, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "avg_checkout_ms": round(self.checkout_time / self.checkouts * 1000, 3) if self.checkouts else None,
+            "max_checkout_ms": round(self.max_checkout_time * 1000, 3),
+            "timeouts": self.timeouts,
+        }
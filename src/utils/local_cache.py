@@ -0,0 +1,79 @@
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+
+class LocalCache:
+    """
+    LRU-кэш ответов в памяти воркера перед Redis.
+
+    Ограничен числом записей и суммарным размером значений. Записи живут не дольше ttl секунд,
+    поэтому даже пропущенное сообщение об инвалидации устаревает быстро.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[bytes, float, str]] = OrderedDict()
+        self._tags: defaultdict[str, set[str]] = defaultdict(set)
+        self._generations: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0, None
+        value, expires_at, _ = entry
+        ttl = expires_at - time.monotonic()
+        if ttl <= 0:
+            self._delete(key)
+            return 0, None
+        self._entries.move_to_end(key)
+        return int(ttl) + 1, value
+
+    def tag_generation(self, tag: str) -> int:
+        return self._generations[tag]
+
+    def set(
+        self, key: str, value: bytes, tag: str, expire: int | None = None, generation: int | None = None
+    ) -> None:
+        # Значение, прочитанное до инвалидации тега, в локальный кэш не кладем
+        if generation is not None and generation != self._generations[tag]:
+            return
+        if len(value) > self.max_bytes:
+            return
+        self._delete(key)
+        ttl = min(expire, self.ttl) if expire else self.ttl
+        self._entries[key] = (value, time.monotonic() + ttl, tag)
+        self._tags[tag].add(key)
+        self.size += len(value)
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._delete(next(iter(self._entries)))
+
+    def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            self._generations[tag] += 1
+            for key in self._tags.pop(tag, ()):
+                self._delete(key)
+
+    def clear(self) -> None:
+        for tag in self._tags:
+            self._generations[tag] += 1
+        self._entries.clear()
+        self._tags.clear()
+        self.size = 0
+
+    def _delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        value, _, tag = entry
+        self.size -= len(value)
+        tag_keys = self._tags.get(tag)
+        if tag_keys is not None:
+            tag_keys.discard(key)
+            if not tag_keys:
+                del self._tags[tag]
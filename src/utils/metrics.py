@@ -0,0 +1,39 @@
+from collections import defaultdict
+from dataclasses import dataclass
+
+
+@dataclass
+class RouteCacheStats:
+    hits: int = 0
+    misses: int = 0
+    hits_time: float = 0.0
+    misses_time: float = 0.0
+
+    def as_dict(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else None,
+            "avg_hit_ms": round(self.hits_time / self.hits * 1000, 3) if self.hits else None,
+            "avg_miss_ms": round(self.misses_time / self.misses * 1000, 3) if self.misses else None,
+        }
+
+
+class CacheMetrics:
+    """Счетчики попаданий и промахов кэша по маршрутам в пределах воркера"""
+
+    def __init__(self):
+        self.routes: dict[str, RouteCacheStats] = defaultdict(RouteCacheStats)
+
+    def record(self, route: str, cache_status: str, elapsed: float) -> None:
+        stats = self.routes[route]
+        if cache_status == "HIT":
+            stats.hits += 1
+            stats.hits_time += elapsed
+        else:
+            stats.misses += 1
+            stats.misses_time += elapsed
+
+    def as_dict(self) -> dict:
+        return {route: stats.as_dict() for route, stats in sorted(self.routes.items())}
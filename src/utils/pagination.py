@@ -0,0 +1,22 @@
+import base64
+import binascii
+import json
+
+from src.exceptions import IncorrectCursorException
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    # Пустой курсор означает первую страницу
+    if not cursor:
+        return 0
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise IncorrectCursorException
+    if not isinstance(last_id, int):
+        raise IncorrectCursorException
+    return last_id
@@ -0,0 +1,72 @@
+import json
+import logging
+from datetime import date, timedelta
+from typing import NamedTuple
+
+from src.config import settings
+from src.init import redis_manager
+
+POPULAR_SEARCH_WINDOWS_KEY = "search-windows:popular"
+POPULAR_SEARCH_WINDOWS_MAX = 1000
+
+
+class SearchWindow(NamedTuple):
+    location: str | None
+    date_from: date
+    date_to: date
+
+    def overlaps(self, date_from: date, date_to: date) -> bool:
+        return self.date_from < date_to and date_from < self.date_to
+
+
+def upcoming_weekends(today: date, count: int) -> list[tuple[date, date]]:
+    # Выходные - заезд в пятницу, выезд в воскресенье
+    friday = today + timedelta(days=(4 - today.weekday()) % 7)
+    return [
+        (friday + timedelta(weeks=week), friday + timedelta(weeks=week, days=2))
+        for week in range(count)
+    ]
+
+
+async def record_search_window(window: SearchWindow) -> None:
+    if redis_manager.redis is None:
+        return
+    member = json.dumps([window.location, window.date_from.isoformat(), window.date_to.isoformat()])
+    try:
+        # Самые редкие окна удаляем сразу, чтобы множество не росло от произвольных адресов
+        async with redis_manager.pipeline() as pipe:
+            pipe.zincrby(POPULAR_SEARCH_WINDOWS_KEY, 1, member)
+            pipe.zremrangebyrank(POPULAR_SEARCH_WINDOWS_KEY, 0, -POPULAR_SEARCH_WINDOWS_MAX - 1)
+            await pipe.execute()
+    except Exception:
+        logging.exception("Не удалось учесть окно поиска отелей")
+
+
+async def get_popular_search_windows(today: date, limit: int) -> list[SearchWindow]:
+    # Прошедшие окна удаляем, чтобы множество не росло
+    members = await redis_manager.redis.zrevrange(POPULAR_SEARCH_WINDOWS_KEY, 0, -1)
+    windows, outdated = [], []
+    for member in members:
+        location, date_from, date_to = json.loads(member)
+        window = SearchWindow(location, date.fromisoformat(date_from), date.fromisoformat(date_to))
+        if window.date_from < today:
+            outdated.append(member)
+        elif len(windows) < limit:
+            windows.append(window)
+    if outdated:
+        await redis_manager.redis.zrem(POPULAR_SEARCH_WINDOWS_KEY, *outdated)
+    return windows
+
+
+async def get_precompute_windows(today: date) -> list[SearchWindow]:
+    """Настроенные окна (ближайшие выходные и праздники по адресам) и самые частые из поисков"""
+    configured = upcoming_weekends(today, settings.PRECOMPUTE_WEEKENDS) + [
+        (date_from, date_to) for date_from, date_to in settings.PRECOMPUTE_HOLIDAYS if date_from >= today
+    ]
+    windows = [
+        SearchWindow(location, date_from, date_to)
+        for location in [None, *settings.PRECOMPUTE_LOCATIONS]
+        for date_from, date_to in configured
+    ]
+    windows += await get_popular_search_windows(today, settings.PRECOMPUTE_POPULAR)
+    return list(dict.fromkeys(windows))
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+import time
+from datetime import date
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from src.api.facilities import get_facilities
+from src.api.hotels import get_hotel_by_id
+from src.api.rooms import get_room_by_id
+from src.config import settings
+from src.database import async_session_maker, engine
+from src.utils.db_manager import DBManager
+
+
+async def open_db_connections(count: int) -> None:
+    # Соединения сверх pool_size пул закроет при возврате, поэтому count не больше его размера
+    connections = await asyncio.gather(*(engine.connect() for _ in range(count)))
+    try:
+        for connection in connections:
+            await connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+async def prime_caches(top_hotels: int) -> None:
+    # Вызываем сами эндпоинты: декоратор кэша сохраняет ответы под теми же ключами,
+    # что и для HTTP-запросов
+    async with DBManager(session_factory=async_session_maker) as db:
+        await get_facilities(db=db)
+        for hotel_id in await db.hotels.get_most_booked_ids(date.today(), top_hotels):
+            await get_hotel_by_id(hotel_id=hotel_id, db=db)
+            for room in await db.rooms.get_filtred(hotel_id=hotel_id):
+                await get_room_by_id(db=db, hotel_id=hotel_id, room_id=room.id)
+
+
+async def warm_up(app: FastAPI) -> None:
+    started_at = time.perf_counter()
+    try:
+        await open_db_connections(settings.WARMUP_DB_CONNECTIONS)
+        await prime_caches(settings.WARMUP_TOP_HOTELS)
+        logging.info(f"Прогрев завершен за {time.perf_counter() - started_at:.2f} с")
+    except Exception:
+        logging.exception("Прогрев завершился с ошибкой")
+    # Ошибка прогрева не должна навсегда выводить воркер из балансировки
+    app.state.ready = True
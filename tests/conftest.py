@@ -7,9 +7,14 @@ from unittest import mock
 mock.patch("fastapi_cache.decorator.cache", lambda *args, **kwargs: lambda f: f).start()
 
 from src.config import settings
-from src.database import Base, engine_null_pool, async_session_maker_null_pool
+from src.database import (
+    Base,
+    engine_null_pool,
+    async_session_maker_null_pool,
+    async_session_maker_null_pool_read_only,
+)
 from src.main import app
-from src.api.dependencies import get_db
+from src.api.dependencies import get_db, get_db_manager, get_read_db
 from httpx import AsyncClient, ASGITransport
 from src.models import *  # noqa
 
@@ -34,12 +39,9 @@ async def setup_database(check_test_mode):
     with open("tests/mock_rooms.json", encoding="utf-8") as file_rooms:
         rooms = json.load(file_rooms)
 
-    hotels = [HotelAdd.model_validate(hotel) for hotel in hotels]
-    rooms = [RoomAdd.model_validate(room) for room in rooms]
-
     async with DBManager(session_factory=async_session_maker_null_pool) as db_:
-        await db_.hotels.add_bulk(hotels)
-        await db_.rooms.add_bulk(rooms)
+        await db_.hotels.add_bulk(HotelAdd.model_validate(hotel) for hotel in hotels)
+        await db_.rooms.add_bulk(RoomAdd.model_validate(room) for room in rooms)
         await db_.commit()
 
 
@@ -54,7 +56,18 @@ async def db() -> DBManager:
         yield db
 
 
+async def get_read_db_null_pool():
+    async with DBManager(
+        session_factory=async_session_maker_null_pool_read_only, read_only=True
+    ) as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = get_db_null_pool
+app.dependency_overrides[get_read_db] = get_read_db_null_pool
+app.dependency_overrides[get_db_manager] = lambda: DBManager(
+    session_factory=async_session_maker_null_pool
+)
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,28 @@
+async def test_get_availability_batch(ac):
+    requests = [
+        {"hotel_id": 1, "date_from": "2024-08-01", "date_to": "2024-08-10"},
+        {"hotel_id": 2, "date_from": "2024-09-01", "date_to": "2024-09-03"},
+        {"hotel_id": 1, "date_from": "2024-10-01", "date_to": "2024-10-05"},
+    ]
+    response = await ac.post("/availability/batch", json=requests)
+    assert response.status_code == 200
+    res = response.json()
+    assert len(res) == len(requests)
+
+    for request, availability in zip(requests, res):
+        assert availability["hotel_id"] == request["hotel_id"]
+        response_rooms = await ac.get(
+            f"/hotels/{request['hotel_id']}/rooms",
+            params={"date_from": request["date_from"], "date_to": request["date_to"]},
+        )
+        assert {room["id"] for room in availability["rooms"]} == {
+            room["id"] for room in response_rooms.json()
+        }
+
+
+async def test_get_availability_batch_wrong_dates(ac):
+    response = await ac.post(
+        "/availability/batch",
+        json=[{"hotel_id": 1, "date_from": "2024-08-10", "date_to": "2024-08-01"}],
+    )
+    assert response.status_code == 422
@@ -0,0 +1,46 @@
+from datetime import date
+
+from src.schemas.bookings import BookingAdd
+from src.utils.availability_engine import AvailabilityEngine
+
+
+async def assert_engine_matches_sql(engine, db, hotel_id, date_from, date_to):
+    engine_rooms = await engine.get_filtered_by_time(db, hotel_id, date_from, date_to)
+    sql_rooms = await db.rooms.get_filtered_by_time(hotel_id, date_from, date_to)
+    assert engine_rooms is not None
+    assert {room.id for room in engine_rooms} == {room.id for room in sql_rooms}
+
+
+async def test_availability_engine_matches_sql(db):
+    engine = AvailabilityEngine(max_hotels=1, ttl=60)
+    user_id = (await db.users.get_all())[0].id
+    room = (await db.rooms.get_all())[0]
+    date_from = date(year=2031, month=3, day=1)
+    date_to = date(year=2031, month=3, day=4)
+
+    await assert_engine_matches_sql(engine, db, room.hotel_id, date_from, date_to)
+
+    for _ in range(room.quantity):
+        booking = await db.bookings.add_booking(
+            BookingAdd(
+                user_id=user_id,
+                room_id=room.id,
+                date_from=date_from,
+                date_to=date_to,
+                price=room.price,
+            )
+        )
+        engine.add_booking(room.hotel_id, booking)
+
+    for window in [
+        (date_from, date_to),
+        (date(year=2031, month=2, day=27), date(year=2031, month=3, day=2)),
+        (date(year=2031, month=3, day=3), date(year=2031, month=3, day=10)),
+        (date_to, date(year=2031, month=3, day=10)),
+    ]:
+        await assert_engine_matches_sql(engine, db, room.hotel_id, *window)
+
+    other_hotel_id = (await db.hotels.get_all())[-1].id
+    await engine.get_filtered_by_time(db, other_hotel_id, date_from, date_to)
+    assert len(engine) == 1
+    assert room.hotel_id not in engine
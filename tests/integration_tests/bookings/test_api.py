@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from tests.conftest import get_db_null_pool
@@ -70,3 +72,13 @@ async def test_add_and_get_my_bookings(
     response_my_bookings = await authenticated_ac.get("/bookings/me")
     assert response_my_bookings.status_code == 200
     assert len(response_my_bookings.json()) == booked_rooms
+
+
+async def test_stream_bookings(db, authenticated_ac):
+    response = await authenticated_ac.get("/bookings/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    bookings = [json.loads(line) for line in response.text.splitlines()]
+    assert {booking["id"] for booking in bookings} == {
+        booking.id for booking in await db.bookings.get_all()
+    }
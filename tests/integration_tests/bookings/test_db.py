@@ -1,5 +1,13 @@
+import asyncio
+import logging
+import time
 from datetime import date
+
+import pytest
+
+from src.exceptions import AllRoomsAreBookedException
 from src.schemas.bookings import BookingAdd
+from tests.conftest import get_db_null_pool
 
 
 async def test_booking_crud(db):
@@ -40,3 +48,97 @@ async def test_booking_crud(db):
     await db.bookings.delete(id=new_booking.id)
     booking = await db.bookings.get_one_or_none(id=new_booking.id)
     assert not booking
+
+
+async def test_room_inventory_rebuild(db):
+    inventory_before = {
+        (item.room_id, item.night, item.rooms_left)
+        for item in await db.room_inventory.get_all()
+    }
+
+    for period in ({}, {"date_from": date(2024, 8, 15)}, {"date_to": date(2024, 8, 15)}):
+        await db.room_inventory.rebuild(**period)
+
+        inventory_after = {
+            (item.room_id, item.night, item.rooms_left)
+            for item in await db.room_inventory.get_all()
+        }
+        assert inventory_after == inventory_before
+
+
+async def test_add_bookings_bulk_from_generator(db):
+    user_id = (await db.users.get_all())[0].id
+    room = (await db.rooms.get_all())[2]
+    date_from, date_to = date(2031, 3, 1), date(2031, 3, 4)
+
+    def bookings(count: int):
+        for _ in range(count):
+            yield BookingAdd(
+                user_id=user_id,
+                room_id=room.id,
+                date_from=date_from,
+                date_to=date_to,
+                price=room.price,
+            )
+
+    assert await db.bookings.add_bulk(bookings(room.quantity)) == room.quantity
+    added = await db.bookings.get_filtred(room_id=room.id, date_from=date_from, date_to=date_to)
+    assert len(added) == room.quantity
+    inventory = await db.room_inventory.get_filtred(room_id=room.id)
+    rooms_left = {
+        item.night: item.rooms_left for item in inventory if date_from <= item.night < date_to
+    }
+    assert rooms_left == {date(2031, 3, day): 0 for day in (1, 2, 3)}
+
+    # Ничего не коммитим: фикстура db откатывает транзакцию
+    with pytest.raises(AllRoomsAreBookedException):
+        await db.bookings.add_bulk(bookings(1))
+
+
+async def test_concurrent_bookings_do_not_overbook(db):
+    user_id = (await db.users.get_all())[0].id
+    room = (await db.rooms.get_all())[1]
+    booking_data = BookingAdd(
+        user_id=user_id,
+        room_id=room.id,
+        date_from=date(year=2030, month=1, day=1),
+        date_to=date(year=2030, month=1, day=5),
+        price=room.price,
+    )
+    requests_count = 200
+    connections = asyncio.Semaphore(50)
+
+    async def book() -> bool:
+        async with connections:
+            async for _db in get_db_null_pool():
+                try:
+                    await _db.bookings.add_booking(booking_data)
+                    await _db.commit()
+                    return True
+                except AllRoomsAreBookedException:
+                    return False
+
+    started_at = time.perf_counter()
+    try:
+        results = await asyncio.gather(*[book() for _ in range(requests_count)])
+        elapsed = time.perf_counter() - started_at
+
+        assert sum(results) == room.quantity
+        bookings = await db.bookings.get_filtred(
+            room_id=room.id, date_from=booking_data.date_from, date_to=booking_data.date_to
+        )
+        assert len(bookings) == room.quantity
+        logging.info(
+            f"{requests_count} параллельных запросов на бронирование за {elapsed:.2f} с: "
+            f"{requests_count / elapsed:.1f} запросов/с"
+        )
+    finally:
+        # Бронирования закоммичены в отдельных сессиях: удаляем их и пересобираем остатки,
+        # чтобы не влиять на остальные тесты
+        async for _db in get_db_null_pool():
+            bookings = await _db.bookings.get_filtred(
+                room_id=room.id, date_from=booking_data.date_from, date_to=booking_data.date_to
+            )
+            await _db.bookings.delete_bulk([booking.id for booking in bookings])
+            await _db.room_inventory.rebuild(booking_data.date_from, booking_data.date_to)
+            await _db.commit()
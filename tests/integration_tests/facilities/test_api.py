@@ -1,3 +1,6 @@
+from src.init import redis_manager
+
+
 async def test_get_facilities(ac):
     response = await ac.get("/facilities")
     assert response.status_code == 200
@@ -12,3 +15,25 @@ async def test_post_facilities(ac):
     assert isinstance(res, dict)
     assert res["data"]["title"] == facility_title
     assert "data" in res
+
+
+async def test_get_facilities_conditional(ac):
+    # ETag - версия тега кэша в Redis
+    await redis_manager.connect()
+    try:
+        response = await ac.get("/facilities")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+
+        not_modified = await ac.get("/facilities", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert not_modified.content == b""
+
+        await ac.post("/facilities", json={"title": "Сауна"})
+        modified = await ac.get("/facilities", headers={"If-None-Match": etag})
+        assert modified.status_code == 200
+        assert modified.headers["etag"] != etag
+        assert "Сауна" in {facility["title"] for facility in modified.json()}
+    finally:
+        await redis_manager.close()
@@ -1,3 +1,8 @@
+from src.config import settings
+from src.init import hotels_bloom, redis_manager
+from src.schemas.hotels import Hotel, HotelAdd
+
+
 async def test_get_hotels(ac):
     response = await ac.get(
         "/hotels",
@@ -7,3 +12,79 @@ async def test_get_hotels(ac):
         },
     )
     assert response.status_code == 200
+
+
+async def test_get_hotels_with_cursor(ac):
+    params = {"date_from": "2024-08-01", "date_to": "2024-08-10", "per_page": 2}
+    response = await ac.get("/hotels", params={**params, "cursor": ""})
+    assert response.status_code == 200
+    hotels_ids = []
+    while True:
+        res = response.json()
+        assert len(res["data"]) <= 2
+        hotels_ids.extend(hotel["id"] for hotel in res["data"])
+        if res["next_cursor"] is None:
+            break
+        response = await ac.get("/hotels", params={**params, "cursor": res["next_cursor"]})
+        assert response.status_code == 200
+
+    assert hotels_ids == sorted(set(hotels_ids))
+    assert hotels_ids
+
+
+async def test_get_hotels_with_incorrect_cursor(ac):
+    response = await ac.get(
+        "/hotels",
+        params={"date_from": "2024-08-01", "date_to": "2024-08-10", "cursor": "abc"},
+    )
+    assert response.status_code == 400
+
+
+async def test_get_hotels_fuzzy(ac):
+    params = {"date_from": "2024-08-01", "date_to": "2024-08-10"}
+    response = await ac.get("/hotels", params=params)
+    hotel = response.json()[0]
+
+    title_with_typo = hotel["title"][:-1] + "ъ"
+    response = await ac.get("/hotels", params={**params, "title": title_with_typo, "fuzzy": True})
+    assert response.status_code == 200
+    assert hotel["id"] in [found_hotel["id"] for found_hotel in response.json()]
+
+
+async def test_hotels_bloom_filter(ac, db):
+    await redis_manager.connect()
+    try:
+        async def no_ids():
+            for ids in ():
+                yield ids
+
+        # Отели из фикстур вставлены без подключения к Redis: заполненный пустым фильтр их не знает
+        await hotels_bloom.fill(no_ids())
+        hotel = (await db.hotels.get_all())[0]
+        response = await ac.get(f"/hotels/{hotel.id}")
+        assert response.status_code == 404
+
+        # Так их дописывает задача refill_bloom_filters
+        await hotels_bloom.fill(db.hotels.iter_ids())
+        response = await ac.get(f"/hotels/{hotel.id}")
+        assert response.status_code == 200
+
+        # Каждый путь вставки репозитория добавляет новые id в фильтр
+        await db.hotels.add(HotelAdd(title="Bloom", location="Тверь"))
+        await db.hotels.add_bulk([HotelAdd(title="Bloom", location="Тверь")])
+        await db.hotels.add_bulk(
+            HotelAdd(title=f"Bloom {i}", location="Тверь") for i in range(settings.DB_COPY_MIN_ROWS)
+        )
+        await db.hotels.add_bulk(
+            [
+                Hotel(id=10 ** 9 + i, title=f"Bloom {i}", location="Тверь")
+                for i in range(settings.DB_COPY_MIN_ROWS)
+            ],
+            conflict_columns=["id"],
+        )
+        hotels = await db.hotels.get_filtred(location="Тверь")
+        assert len(hotels) == 2 * settings.DB_COPY_MIN_ROWS + 2
+        assert all([await hotels_bloom.might_contain(hotel.id) for hotel in hotels])
+    finally:
+        await redis_manager.delete(hotels_bloom.key)
+        await redis_manager.close()
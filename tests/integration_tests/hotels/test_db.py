@@ -1,7 +1,62 @@
-from src.schemas.hotels import HotelAdd
+from src.config import settings
+from src.models.hotels import HotelsOrm
+from src.schemas.hotels import Hotel, HotelAdd, HotelPatch
 
 
 async def test_add_hotel(db):
     hotel_data = HotelAdd(title="Hotel 5 stars", location="Сочи")
     await db.hotels.add(hotel_data)
     await db.commit()
+
+
+async def test_edit_and_delete_hotels_bulk(db):
+    hotels = [
+        await db.hotels.add(HotelAdd(title=f"Hotel {i}", location="Анапа"))
+        for i in range(3)
+    ]
+    hotels_ids = [hotel.id for hotel in hotels]
+
+    edited_hotels = await db.hotels.edit_bulk(
+        HotelPatch(location="Геленджик"), hotels_ids, exclude_unset=True
+    )
+    assert {hotel.id for hotel in edited_hotels} == set(hotels_ids)
+    assert all(hotel.location == "Геленджик" for hotel in edited_hotels)
+
+    edited_hotel = await db.hotels.edit(
+        HotelPatch(title="Hotel 5 stars"), exclude_unset=True, id=hotels_ids[0]
+    )
+    assert edited_hotel.title == "Hotel 5 stars"
+
+    deleted_hotels = await db.hotels.delete_bulk(hotels_ids)
+    assert {hotel.id for hotel in deleted_hotels} == set(hotels_ids)
+    assert await db.hotels.get_filtred(HotelsOrm.id.in_(hotels_ids)) == []
+
+
+async def test_add_hotels_bulk_with_merge(db):
+    # Не меньше DB_COPY_MIN_ROWS строк: загрузка идет через COPY, несколькими пачками
+    rows_count = settings.DB_COPY_MIN_ROWS + 5
+    copied = await db.hotels.add_bulk(
+        (HotelAdd(title=f"Hotel {i}", location="Ейск") for i in range(rows_count)),
+        chunk_size=settings.DB_COPY_MIN_ROWS // 2,
+    )
+    assert copied == rows_count
+    hotels = await db.hotels.get_filtred(location="Ейск")
+    assert len(hotels) == rows_count
+
+    # Строки с одинаковым ключом: применяется последняя, и через COPY, и через INSERT
+    for count in (settings.DB_COPY_MIN_ROWS, 2):
+        await db.hotels.add_bulk(
+            [
+                Hotel(id=hotels[0].id, title=f"Hotel {i} stars", location="Ейск")
+                for i in range(count)
+            ],
+            conflict_columns=["id"],
+        )
+        assert (await db.hotels.get_one(id=hotels[0].id)).title == f"Hotel {count - 1} stars"
+
+    await db.hotels.add_bulk(
+        [Hotel(id=hotels[1].id, title="Hotel 5 stars", location="Ейск")],
+        conflict_columns=["id"],
+        update_on_conflict=False,
+    )
+    assert (await db.hotels.get_one(id=hotels[1].id)).title == hotels[1].title
@@ -0,0 +1,16 @@
+from src.main import app
+
+
+async def test_readiness(ac):
+    # Без lifespan прогрев не запускается: готовность выставляем сами
+    app.state.ready = False
+    try:
+        response = await ac.get("/health/ready")
+        assert response.status_code == 503
+
+        app.state.ready = True
+        response = await ac.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
+    finally:
+        del app.state.ready
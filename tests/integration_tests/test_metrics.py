@@ -0,0 +1,5 @@
+async def test_get_db_pool_metrics(ac):
+    response = await ac.get("/metrics/db-pool")
+    assert response.status_code == 200
+    primary = response.json()["primary"]
+    assert {"size", "checked_out", "overflow", "checkouts", "timeouts"} <= set(primary)
@@ -0,0 +1,274 @@
+import asyncio
+import uuid
+from datetime import date
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+from redis.asyncio import Redis
+
+from src.api.bookings import get_my_bookings
+from src.api.dependencies import PaginationParams
+from src.api.hotels import get_hotels
+from src.config import settings
+from src.init import redis_manager
+from src.tasks.tasks import enqueue_precompute_hotel_searches, hotels_search_cache_key
+from src.utils.bloom import BloomFilter
+from src.utils.cache import (
+    CACHE_PREFIX,
+    TaggedRedisBackend,
+    cache,
+    cache_missing,
+    cache_tag_version,
+    invalidate_cache_tags,
+    is_cached_missing,
+    lock_key,
+    missing_key,
+    tag_key,
+    tagged_key_builder,
+    version_key,
+)
+from src.utils.db_manager import DBManager
+from src.utils.local_cache import LocalCache
+from src.utils.metrics import CacheMetrics
+from src.utils.search_windows import SearchWindow, record_search_window
+
+
+def test_cache_key_ignores_injected_dependencies():
+    def build_key(user_id: int) -> str:
+        return tagged_key_builder(
+            get_my_bookings,
+            "fastapi-cache:bookings",
+            args=(),
+            kwargs={"db": DBManager(session_factory=None), "user_id": user_id},
+        )
+
+    assert build_key(1) == build_key(1)
+    assert build_key(1) != build_key(2)
+    assert build_key(1).startswith("fastapi-cache:bookings:")
+
+
+def test_cache_metrics():
+    metrics = CacheMetrics()
+    metrics.record("/hotels", "MISS", 0.02)
+    metrics.record("/hotels", "HIT", 0.001)
+    metrics.record("/hotels", "HIT", 0.003)
+
+    stats = metrics.as_dict()["/hotels"]
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.6667
+    assert stats["avg_hit_ms"] == 2.0
+
+
+def test_local_cache_eviction_and_invalidation():
+    local_cache = LocalCache(max_entries=2, max_bytes=10, ttl=60)
+    local_cache.set("a", b"1234", "hotels")
+    local_cache.set("b", b"1234", "facilities")
+    assert local_cache.get_with_ttl("a")[1] == b"1234"
+
+    local_cache.set("c", b"1234", "hotels")
+    assert local_cache.get_with_ttl("b") == (0, None)
+    assert len(local_cache) == 2
+
+    local_cache.set("d", b"12345678", "hotels")
+    assert local_cache.size <= 10
+
+    generation = local_cache.tag_generation("hotels")
+    local_cache.invalidate_tags("hotels")
+    assert len(local_cache) == 0
+    local_cache.set("e", b"1", "hotels", generation=generation)
+    assert local_cache.get_with_ttl("e") == (0, None)
+
+
+@pytest.fixture
+async def redis():
+    redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+    yield redis
+    await redis.aclose()
+
+
+@pytest.fixture
+async def cache_key(redis):
+    key = f"{CACHE_PREFIX}:tests:{uuid.uuid4().hex}"
+    yield key
+    await redis.delete(key, lock_key(key), tag_key("tests"))
+
+
+async def test_cache_single_flight(redis, cache_key):
+    backend = TaggedRedisBackend(redis, stale_ttl=60, lock_timeout=5)
+    assert await backend.get_with_ttl(cache_key) == (0, None)
+
+    waiter = asyncio.create_task(backend.get_with_ttl(cache_key))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    await backend.set(cache_key, b"[]", 60)
+
+    assert await waiter == (60, b"[]")
+    assert cache_key not in backend._flights
+    assert not await redis.exists(lock_key(cache_key))
+
+
+async def test_cache_serves_stale_while_revalidating(redis, cache_key):
+    backend = TaggedRedisBackend(redis, stale_ttl=60, lock_timeout=5)
+    # Осталось меньше stale_ttl: значение устарело, но еще хранится
+    await redis.set(cache_key, b"[1]", ex=30)
+
+    assert await backend.get_with_ttl(cache_key) == (0, None)
+    assert await backend.get_with_ttl(cache_key) == (0, b"[1]")
+
+    await backend.set(cache_key, b"[2]", 60)
+    ttl, value = await backend.get_with_ttl(cache_key)
+    assert value == b"[2]"
+    assert 0 < ttl <= 60
+
+
+async def test_local_cache_keyed_by_tag_version(redis, cache_key):
+    backend = TaggedRedisBackend(redis, local_cache=LocalCache(max_entries=10, max_bytes=1000, ttl=60))
+    token = cache_tag_version.set("1")
+    try:
+        await backend.set(cache_key, b"[1]", 60)
+        assert await backend.get_with_ttl(cache_key) == (60, b"[1]")
+
+        # Другой воркер сбросил тег, а инвалидация по pub/sub еще не пришла
+        await redis.delete(cache_key)
+        cache_tag_version.set("2")
+        assert (await backend.get_with_ttl(cache_key))[1] is None
+    finally:
+        cache_tag_version.reset(token)
+        await redis.delete(lock_key(cache_key))
+
+
+async def test_cache_failed_recompute_releases_waiters(redis, cache_key):
+    backend = TaggedRedisBackend(redis, stale_ttl=60, lock_timeout=5)
+    recomputing = asyncio.Event()
+    fail = asyncio.Event()
+
+    # Эндпоинт, который стал ведущим пересчета ключа и упал
+    @cache(expire=60, namespace="tests")
+    async def get_missing_hotel():
+        await backend.get_with_ttl(cache_key)
+        recomputing.set()
+        await fail.wait()
+        raise HTTPException(status_code=404)
+
+    leader = asyncio.create_task(get_missing_hotel())
+    await recomputing.wait()
+    waiter = asyncio.create_task(backend.get_with_ttl(cache_key))
+    await asyncio.sleep(0.01)
+    fail.set()
+
+    with pytest.raises(HTTPException):
+        await leader
+    assert await asyncio.wait_for(waiter, 1) == (0, None)
+    assert cache_key not in backend._flights
+    assert not await redis.exists(lock_key(cache_key))
+
+
+@pytest.fixture
+async def connected_redis_manager():
+    await redis_manager.connect()
+    yield redis_manager
+    await redis_manager.close()
+
+
+async def test_bloom_filter(connected_redis_manager):
+    bloom = BloomFilter(connected_redis_manager, f"tests-{uuid.uuid4().hex}", 2 ** 16, 7)
+
+    async def batches():
+        yield [1, 2]
+        yield [3]
+
+    try:
+        # Пока фильтр не заполнен, он не отвергает ни один id
+        assert await bloom.might_contain(100)
+        await bloom.fill(batches())
+        assert await bloom.is_ready()
+        assert all([await bloom.might_contain(item) for item in (1, 2, 3)])
+        assert not await bloom.might_contain(100)
+        await bloom.add(100)
+        assert await bloom.might_contain(100)
+
+        # Не удалось добавить id: фильтр больше не полон и не отвергает ни один id
+        with mock.patch.object(connected_redis_manager, "pipeline", side_effect=ConnectionError):
+            await bloom.add(200)
+        assert not await bloom.is_ready()
+        assert await bloom.might_contain(200)
+    finally:
+        await connected_redis_manager.delete(bloom.key)
+
+
+async def test_negative_cache(connected_redis_manager):
+    tag = f"tests:{uuid.uuid4().hex}"
+    assert not await is_cached_missing(tag, 1)
+
+    await cache_missing(tag, 1, 30)
+    assert await is_cached_missing(tag, 1)
+    assert not await is_cached_missing(tag, 2)
+    # Каждый id хранится отдельным ключом со своим сроком жизни
+    assert 0 < await connected_redis_manager.redis.ttl(missing_key(tag, 1)) <= 30
+
+    # Запись в БД сбрасывает отрицательный кэш вместе с тегом
+    await invalidate_cache_tags(tag)
+    assert not await is_cached_missing(tag, 1)
+
+
+def test_hotels_search_cache_key_matches_endpoint_key():
+    window = SearchWindow("Сочи", date(2030, 7, 5), date(2030, 7, 7))
+    # Так декоратор кэша строит ключ для GET /hotels?location=Сочи&date_from=...&date_to=...
+    endpoint_key = tagged_key_builder(
+        get_hotels,
+        "fastapi-cache:hotels",
+        args=(),
+        kwargs={
+            "pagination": PaginationParams(page=1, per_page=None, cursor=None),
+            "db": DBManager(session_factory=None),
+            "location": "Сочи",
+            "title": None,
+            "date_from": date(2030, 7, 5),
+            "date_to": date(2030, 7, 7),
+            "fuzzy": False,
+        },
+    )
+
+    assert hotels_search_cache_key(window) == endpoint_key
+    assert hotels_search_cache_key(window._replace(location=None)) != endpoint_key
+
+
+async def test_record_search_window_keeps_most_popular(connected_redis_manager):
+    key = f"tests-{uuid.uuid4().hex}"
+    windows = [SearchWindow(f"City {i}", date(2030, 7, 5), date(2030, 7, 7)) for i in range(3)]
+    try:
+        with (
+            mock.patch("src.utils.search_windows.POPULAR_SEARCH_WINDOWS_KEY", key),
+            mock.patch("src.utils.search_windows.POPULAR_SEARCH_WINDOWS_MAX", 2),
+        ):
+            for window in (windows[0], windows[0], windows[1], windows[1], windows[2]):
+                await record_search_window(window)
+        assert await connected_redis_manager.redis.zcard(key) == 2
+        assert await connected_redis_manager.redis.zscore(key, '["City 2", "2030-07-05", "2030-07-07"]') is None
+    finally:
+        await connected_redis_manager.delete(key)
+
+
+async def test_set_if_tag_unchanged(redis, cache_key):
+    backend = TaggedRedisBackend(redis, stale_ttl=60)
+    await redis.set(version_key("tests"), "1")
+    try:
+        assert await backend.set_if_tag_unchanged(cache_key, b"[1]", 60, "1")
+        assert await redis.get(cache_key) == b"[1]"
+
+        # Тег сбросили, пока считался ответ: результат не записывается
+        await redis.set(version_key("tests"), "2")
+        assert not await backend.set_if_tag_unchanged(cache_key, b"[2]", 60, "1")
+        assert await redis.get(cache_key) == b"[1]"
+    finally:
+        await redis.delete(version_key("tests"))
+
+
+async def test_enqueue_precompute_ignores_broker_errors():
+    with mock.patch(
+        "src.tasks.tasks.precompute_hotel_searches.delay", side_effect=ConnectionError
+    ) as delay:
+        await enqueue_precompute_hotel_searches(date(2030, 7, 5), date(2030, 7, 7))
+    delay.assert_called_once_with("2030-07-05", "2030-07-07")
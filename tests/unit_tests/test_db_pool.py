@@ -0,0 +1,35 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from src.utils.db_pool import TimedAsyncAdaptedQueuePool
+
+
+async def test_timed_pool_stats():
+    # Очередь асинхронного пула ждет соединение через await: вызываем его, как движок, в greenlet
+    pool = TimedAsyncAdaptedQueuePool(mock.MagicMock, pool_size=1, max_overflow=1, timeout=0.01)
+    first = await greenlet_spawn(pool.connect)
+    second = await greenlet_spawn(pool.connect)
+
+    stats = pool.stats()
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["avg_checkout_ms"] is not None
+    assert stats["timeouts"] == 0
+
+    # Пул и overflow заняты: ожидание соединения завершается таймаутом
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["checkouts"] == 3
+    assert stats["max_checkout_ms"] >= 10
+
+    await greenlet_spawn(first.close)
+    await greenlet_spawn(second.close)
+    stats = pool.stats()
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 1
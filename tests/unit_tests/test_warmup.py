@@ -0,0 +1,48 @@
+from functools import partial
+from types import SimpleNamespace
+from unittest import mock
+
+from fastapi import FastAPI
+
+from src.api.facilities import get_facilities
+from src.api.hotels import get_hotel_by_id
+from src.api.rooms import get_room_by_id
+from src.utils.cache import tagged_key_builder
+from src.utils.db_manager import DBManager
+from src.utils.warmup import prime_caches, warm_up
+
+
+async def test_prime_caches_uses_endpoint_cache_keys():
+    db = mock.MagicMock()
+    db.hotels.get_most_booked_ids = mock.AsyncMock(return_value=[1])
+    db.rooms.get_filtred = mock.AsyncMock(return_value=[SimpleNamespace(id=10)])
+    db_manager = mock.MagicMock()
+    db_manager.__aenter__.return_value = db
+    endpoints = {
+        name: mock.AsyncMock() for name in ("get_facilities", "get_hotel_by_id", "get_room_by_id")
+    }
+    with (
+        mock.patch("src.utils.warmup.DBManager", return_value=db_manager),
+        mock.patch.multiple("src.utils.warmup", **endpoints),
+    ):
+        await prime_caches(top_hotels=1)
+
+    # Так декоратор кэша строит ключи для GET /facilities, /hotels/1 и /hotels/1/rooms/10
+    http_db = DBManager(session_factory=None)
+    for func, namespace, http_kwargs in (
+        (get_facilities, "facilities", {"db": http_db}),
+        (get_hotel_by_id, "hotel:{hotel_id}", {"hotel_id": 1, "db": http_db}),
+        (get_room_by_id, "rooms:{hotel_id}", {"db": http_db, "hotel_id": 1, "room_id": 10}),
+    ):
+        call = endpoints[func.__name__].await_args
+        # Позиционные аргументы не попадают в ключ
+        assert call.args == ()
+        build_key = partial(tagged_key_builder, func, f"fastapi-cache:{namespace}", args=())
+        assert build_key(kwargs=call.kwargs) == build_key(kwargs=http_kwargs)
+
+
+async def test_failed_warm_up_still_marks_ready():
+    app = FastAPI()
+    with mock.patch("src.utils.warmup.open_db_connections", side_effect=ConnectionError):
+        await warm_up(app)
+    assert app.state.ready